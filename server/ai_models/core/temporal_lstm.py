@@ -10,7 +10,9 @@
 5. 长期趋势预测
 """
 
+import math
 import numpy as np
+from scipy.special import softmax as _softmax
 from typing import Dict, List, Tuple, Optional
 from collections import deque
 
@@ -68,6 +70,10 @@ class DeepLSTMTemporalModel:
         if self.use_attention:
             self.attention_weights = self._init_attention_weights()
         
+        # 注意力缩放系数 1/sqrt(D)
+        # 注意: 简化实现中query/key的维度是情绪维度(len(EMOTIONS)),而不是hidden_size
+        self._attn_scale = 1.0 / math.sqrt(len(self.EMOTIONS))
+        
         # 情绪转换模型
         self.transition_matrix = self._init_transition_matrix()
         
@@ -173,14 +179,14 @@ class DeepLSTMTemporalModel:
         else:
             attended_output = lstm_output[-1]  # 使用最后一个输出
         
-        # 4. 解码为情绪概率
-        emotion_probs = self._decode_to_emotions(attended_output)
+        # 4. 解码为情绪概率(全程保持为数组,仅在返回时转为字典)
+        probs = self._decode_to_emotions(attended_output)
         
         # 5. 情绪转换约束
-        emotion_probs = self._apply_transition_constraint(emotion_probs)
+        probs = self._apply_transition_constraint(probs)
         
         # 6. 预测下一帧
-        next_emotion_probs = self._predict_next(emotion_probs)
+        next_probs = self._predict_next(probs)
         
         # 7. 检测异常模式
         anomaly_score = self._detect_anomaly()
@@ -188,13 +194,13 @@ class DeepLSTMTemporalModel:
         # 8. 时序一致性
         consistency = self._calculate_consistency()
         
-        max_emotion = max(emotion_probs, key=emotion_probs.get)
+        max_idx = int(probs.argmax())
         
         return {
-            'emotion': max_emotion,
-            'confidence': emotion_probs[max_emotion],
-            'probabilities': emotion_probs,
-            'next_prediction': next_emotion_probs,
+            'emotion': self.EMOTIONS[max_idx],
+            'confidence': float(probs[max_idx]),
+            'probabilities': self._probs_to_dict(probs),
+            'next_prediction': self._probs_to_dict(next_probs),
             'consistency': float(consistency),
             'anomaly_score': float(anomaly_score),
             'sequence_length': len(self.emotion_sequence)
@@ -245,16 +251,10 @@ class DeepLSTMTemporalModel:
         # 计算注意力分数(基于最后一个状态)
         query = lstm_output[-1]
         
-        scores = []
-        for i in range(seq_len):
-            key = lstm_output[i]
-            score = np.dot(query, key) / np.sqrt(len(query))
-            scores.append(score)
+        scores = (lstm_output @ query) * self._attn_scale
         
-        # Softmax
-        scores = np.array(scores)
-        exp_scores = np.exp(scores - np.max(scores))
-        attention_weights = exp_scores / exp_scores.sum()
+        # Softmax(数值稳定)
+        attention_weights = _softmax(scores)
         
         # 加权求和
         attended = np.zeros_like(lstm_output[0])
@@ -263,66 +263,51 @@ class DeepLSTMTemporalModel:
         
         return attended
     
-    def _decode_to_emotions(self, hidden_state: np.ndarray) -> Dict:
-        """解码隐藏状态为情绪概率"""
+    def _decode_to_emotions(self, hidden_state: np.ndarray) -> np.ndarray:
+        """解码隐藏状态为情绪概率(按EMOTIONS顺序的float32数组)"""
         # 简化:直接使用hidden_state作为概率
         probs = hidden_state / (hidden_state.sum() + 1e-6)
-        
-        emotion_probs = {}
-        for i, emo in enumerate(self.EMOTIONS):
-            emotion_probs[emo] = float(max(0, probs[i]))
+        probs = np.maximum(probs, 0).astype(np.float32)
         
         # 归一化
-        total = sum(emotion_probs.values())
+        total = probs.sum()
         if total > 0:
-            emotion_probs = {k: v/total for k, v in emotion_probs.items()}
+            probs /= total
         
-        return emotion_probs
+        return probs
     
-    def _apply_transition_constraint(self, current_probs: Dict) -> Dict:
+    def _apply_transition_constraint(self, current_probs: np.ndarray) -> np.ndarray:
         """应用情绪转换约束"""
         if len(self.emotion_sequence) == 0:
             return current_probs
         
         last_emotion = self.emotion_sequence[-1]
-        emotion_to_idx = {emo: i for i, emo in enumerate(self.EMOTIONS)}
-        
-        if last_emotion not in emotion_to_idx:
+        if last_emotion not in self.EMOTIONS:
             return current_probs
         
-        last_idx = emotion_to_idx[last_emotion]
+        last_idx = self.EMOTIONS.index(last_emotion)
         
-        # 使用转换矩阵调整概率
-        constrained_probs = {}
-        for emo in self.EMOTIONS:
-            curr_idx = emotion_to_idx[emo]
-            transition_prob = self.transition_matrix[last_idx, curr_idx]
-            
-            # 融合当前概率和转换概率
-            constrained_probs[emo] = 0.7 * current_probs.get(emo, 0) + 0.3 * transition_prob
+        # 使用转换矩阵调整概率: 融合当前概率和转换概率
+        constrained_probs = (0.7 * current_probs + 0.3 * self.transition_matrix[last_idx]).astype(np.float32)
         
         # 归一化
-        total = sum(constrained_probs.values())
+        total = constrained_probs.sum()
         if total > 0:
-            constrained_probs = {k: v/total for k, v in constrained_probs.items()}
+            constrained_probs /= total
         
         return constrained_probs
     
-    def _predict_next(self, current_probs: Dict) -> Dict:
+    def _predict_next(self, current_probs: np.ndarray) -> np.ndarray:
         """预测下一帧情绪"""
-        emotion_to_idx = {emo: i for i, emo in enumerate(self.EMOTIONS)}
-        
         # 当前情绪
-        current_emotion = max(current_probs, key=current_probs.get)
-        current_idx = emotion_to_idx[current_emotion]
+        current_idx = int(current_probs.argmax())
         
         # 使用转换矩阵预测
-        next_probs = {}
-        for emo in self.EMOTIONS:
-            next_idx = emotion_to_idx[emo]
-            next_probs[emo] = float(self.transition_matrix[current_idx, next_idx])
-        
-        return next_probs
+        return self.transition_matrix[current_idx]
+    
+    def _probs_to_dict(self, probs: np.ndarray) -> Dict:
+        """将概率数组转换为 {情绪: 概率} 字典"""
+        return dict(zip(self.EMOTIONS, probs.tolist()))
     
     def _detect_anomaly(self) -> float:
         """检测异常模式"""
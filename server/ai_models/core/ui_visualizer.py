@@ -16,7 +16,49 @@ import cv2
 import numpy as np
 from typing import Dict, List, Optional, Tuple
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import time
+import weakref
+
+try:
+    from ._draw_numba import disk_mask, stamp_disks_uint8
+except ImportError:
+    from _draw_numba import disk_mask, stamp_disks_uint8
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    # numba为可选依赖,不可用时以纯Python执行
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+
+
+# 渲染在单线程内逐帧进行,OpenCV内部的OpenMP线程池反而会带来调度开销
+cv2.setNumThreads(1)
+
+
+@njit(cache=True)
+def _radar_points(center_x, center_y, radius, cos_a, sin_a, values, rings):
+    """
+    计算雷达图顶点坐标
+    
+    Returns:
+        (len(rings)+1, n, 2) int32数组: 前len(rings)层为各网格环,最后一层为数据多边形
+    """
+    n = cos_a.shape[0]
+    n_rings = rings.shape[0]
+    out = np.empty((n_rings + 1, n, 2), dtype=np.int32)
+    for k in range(n_rings + 1):
+        for i in range(n):
+            scale = radius * (rings[k] if k < n_rings else values[i])
+            out[k, i, 0] = int(center_x + scale * cos_a[i])
+            out[k, i, 1] = int(center_y + scale * sin_a[i])
+    return out
 
 
 class AdvancedUIVisualizer:
@@ -34,7 +76,9 @@ class AdvancedUIVisualizer:
         self,
         width: int = 1920,
         height: int = 1080,
-        theme: str = 'cyberpunk'
+        theme: str = 'cyberpunk',
+        source_frame_shape: Optional[Tuple[int, int]] = None,
+        use_opencl: bool = False
     ):
         """
         初始化UI可视化器
@@ -43,11 +87,19 @@ class AdvancedUIVisualizer:
             width: 画布宽度
             height: 画布高度
             theme: 主题名称
+            source_frame_shape: 摄像头帧尺寸(高, 宽),提供时预先计算视频缩放尺寸
+            use_opencl: 视频缩放使用OpenCL(T-API),设备不支持时自动回退到CPU
         """
         self.width = width
         self.height = height
         self.theme = theme
         
+        # OpenCL仅用于视频缩放: 画布合成以NumPy视图/原地写入为主,
+        # 整张画布往返显存的拷贝开销大于收益
+        self.use_opencl = bool(use_opencl) and cv2.ocl.haveOpenCL()
+        if self.use_opencl:
+            cv2.ocl.setUseOpenCL(True)
+        
         # 主题配置
         self.themes = {
             'cyberpunk': {
@@ -99,10 +151,25 @@ class AdvancedUIVisualizer:
         self.emotion_history = deque(maxlen=100)
         self.depression_history = deque(maxlen=100)
         self.confidence_history = deque(maxlen=100)
+        # 历史数据版本号,update_data 时递增,用于判断趋势图是否需要重绘
+        self._history_version = 0
         
-        # 粒子系统
-        self.particles = []
+        # 粒子系统(结构数组: 每个属性一个预分配数组, _p_alive 标记有效槽位)
         self.max_particles = 50
+        self._p_x = np.zeros(self.max_particles, dtype=np.float32)
+        self._p_y = np.zeros(self.max_particles, dtype=np.float32)
+        self._p_vx = np.zeros(self.max_particles, dtype=np.float32)
+        self._p_vy = np.zeros(self.max_particles, dtype=np.float32)
+        self._p_life = np.zeros(self.max_particles, dtype=np.float32)
+        self._p_alive = np.zeros(self.max_particles, dtype=bool)
+        self._particle_mask = disk_mask(2)
+        
+        # 随机数生成器和预分配缓冲(语音波形采样、雷达图扰动)
+        self._rng = np.random.default_rng()
+        self._wave_buf = np.empty(200, dtype=np.float32)
+        self._radar_noise = np.empty(6)
+        self._radar_noise_low = np.array([-0.1, -0.15, -0.1, -0.2, -0.15, -0.1])
+        self._radar_noise_span = np.array([0.2, 0.3, 0.2, 0.3, 0.3, 0.2])
         
         # 动画参数
         self.animation_time = 0
@@ -113,6 +180,70 @@ class AdvancedUIVisualizer:
         self.panel_width = width - self.video_width
         self.video_height = int(self.video_width * 9 / 16)  # 16:9
         
+        # 面部网格连接(68点模型,简化版),每条折线为一个索引数组
+        self._mesh_polylines = [
+            np.arange(0, 16),                          # 下巴轮廓
+            np.arange(17, 22),                         # 左眉
+            np.arange(22, 27),                         # 右眉
+            np.arange(27, 31),                         # 鼻梁
+            np.arange(31, 36),                         # 鼻子下部
+            np.r_[np.arange(36, 42), 36],              # 左眼
+            np.r_[np.arange(42, 48), 42],              # 右眼
+            np.r_[np.arange(48, 60), 48],              # 外嘴唇
+            np.r_[np.arange(60, 68), 60],              # 内嘴唇
+        ]
+        
+        # 视频缩放尺寸(按输入帧尺寸缓存,尺寸变化时重新计算)
+        self._video_source_shape = None
+        if source_frame_shape is not None:
+            self._update_video_geometry(*source_frame_shape[:2])
+        
+        # 视频阴影参数
+        self.border_size = 3
+        self.shadow_size = 10
+        
+        # 面板布局 (x, y, 宽, 高): 右侧面板自上而下堆叠,间隔20
+        panel_x = self.video_width + 40
+        panel_w = self.panel_width - 60
+        self.header_height = 40
+        self.emotion_panel_rect = (panel_x, 50, panel_w, 280)
+        self.trend_chart_rect = (panel_x, 50 + 280 + 20, panel_w, 200)
+        self.radar_panel_rect = (panel_x, 350 + 200 + 20, panel_w, 240)
+        self.waveform_rect = (30, height - 100 - 80, self.video_width, 100)
+        
+        # 可缓存面板的画布区域(行切片, 列切片): 覆盖面板矩形(含边框)并延伸到画布右缘,
+        # 以包含进度条右侧的数值文字
+        self._panel_regions = {
+            name: (slice(ry, ry + rh + 1), slice(rx, width))
+            for name, (rx, ry, rw, rh) in (('emotion', self.emotion_panel_rect),
+                                           ('trend', self.trend_chart_rect))
+        }
+        
+        # 抑郁风险仪表盘指针偏移查找表(按半径缓存): 下标 i 对应数值 i/255
+        self.gauge_radius = 80
+        self._gauge_luts = {self.gauge_radius: self._build_gauge_lut(self.gauge_radius)}
+        
+        # 健康指标雷达图(6个维度)
+        self.radar_labels = ["Emotion", "Energy", "Social", "Sleep", "Appetite", "Focus"]
+        self.radar_radius = 180 // 2
+        self.radar_center = (panel_x + panel_w // 2, self.radar_panel_rect[1] + 140)
+        self._radar_rings = np.array([0.25, 0.5, 0.75, 1.0])
+        radar_angles = 2 * np.pi * np.arange(len(self.radar_labels)) / len(self.radar_labels) - np.pi / 2
+        self._radar_cos = np.cos(radar_angles)
+        self._radar_sin = np.sin(radar_angles)
+        self._radar_point_mask = disk_mask(4)
+        
+        # 依赖主题的预计算资源(含静态背景层)
+        self._precompute_theme_assets()
+        
+        # 复用的画布缓冲,每帧由背景层覆盖
+        self._canvas = np.empty((height, width, 3), dtype=np.uint8)
+        
+        # 视频区域渲染线程: 与右侧面板绘制并行(OpenCV调用会释放GIL);
+        # 首帧渲染时创建,close() 或实例被回收时释放
+        self._pool = None
+        self._pool_finalizer = None
+        
         print(f"✓ UI可视化器已初始化 (主题: {theme})")
     
     def render_frame(
@@ -121,7 +252,8 @@ class AdvancedUIVisualizer:
         face_result: Optional[Dict],
         voice_result: Optional[Dict],
         fusion_result: Optional[Dict],
-        landmarks: Optional[np.ndarray] = None
+        landmarks: Optional[np.ndarray] = None,
+        copy: bool = False
     ) -> np.ndarray:
         """
         渲染完整UI界面
@@ -132,39 +264,50 @@ class AdvancedUIVisualizer:
             voice_result: 语音分析结果
             fusion_result: 融合结果
             landmarks: 面部关键点
+            copy: 是否返回独立副本。默认返回内部复用的画布缓冲,
+                  下一次调用时会被覆盖;需要跨帧保留结果时传 True
             
         Returns:
             渲染后的界面
         """
-        # 创建画布
-        canvas = np.full((self.height, self.width, 3), self.colors['bg_color'], dtype=np.uint8)
+        # 重置画布(从静态背景层复制,只在其上绘制动态内容)
+        canvas = self._canvas
+        np.copyto(canvas, self._background_layer)
         
         # 更新动画
         self.animation_time = (self.animation_time + 0.05) % (2 * np.pi)
         self.glow_intensity = (np.sin(self.animation_time) + 1) / 2
         
-        # 1. 渲染视频区域
-        video_display = self._render_video_area(video_frame, landmarks, face_result)
+        # 融合结果只解包一次,传给各面板
+        fusion_ok = bool(fusion_result) and fusion_result.get('status') == 'success'
+        if fusion_ok:
+            emotion_data = fusion_result.get('emotion', {})
+            assessment = fusion_result.get('assessment', {})
+            emotion = emotion_data.get('emotion', 'unknown')
+            confidence = emotion_data.get('confidence', 0.0)
+            depression_score = fusion_result.get('depression_score', 0.0)
+            risk_label = assessment.get('risk_label', '未知')
+            risk_level = assessment.get('risk_level', 'unknown')
+        else:
+            emotion, confidence, depression_score = 'unknown', 0.0, 0.0
+            risk_label, risk_level = '未知', 'unknown'
         
-        # 放置视频
-        video_y = 50
-        video_x = 30
-        if video_display.shape[0] <= self.height - video_y and video_display.shape[1] <= self.video_width:
-            canvas[video_y:video_y+video_display.shape[0],
-                   video_x:video_x+video_display.shape[1]] = video_display
+        # 1. 渲染视频区域(在后台线程进行,与面板绘制的画布区域互不重叠)
+        video_future = self._get_pool().submit(self._render_video_area, video_frame, landmarks, face_result)
         
         # 2. 渲染右侧面板
-        panel_x = self.video_width + 40
-        panel_y = 50
-        
         # 情绪和风险评估
-        panel_y = self._render_emotion_panel(canvas, panel_x, panel_y, fusion_result)
+        # 输入未变化时直接贴回上次的绘制结果
+        panel_args = (fusion_ok, emotion, confidence, depression_score, risk_label, risk_level)
+        self._render_cached(canvas, 'emotion', panel_args,
+                            self._render_emotion_panel, *panel_args)
         
         # 情绪趋势图
-        panel_y = self._render_trend_chart(canvas, panel_x, panel_y + 20)
+        self._render_cached(canvas, 'trend', self._history_version,
+                            self._render_trend_chart)
         
         # 健康指标雷达图
-        panel_y = self._render_health_radar(canvas, panel_x, panel_y + 20, fusion_result)
+        self._render_health_radar(canvas, fusion_ok, depression_score)
         
         # 3. 渲染底部语音波形
         self._render_voice_waveform(canvas, voice_result)
@@ -172,13 +315,18 @@ class AdvancedUIVisualizer:
         # 4. 渲染顶部标题栏
         self._render_header(canvas)
         
-        # 5. 渲染粒子效果
-        self._render_particles(canvas, fusion_result)
+        # 放置视频
+        video_display = video_future.result()
+        video_y = 50
+        video_x = 30
+        if video_display.shape[0] <= self.height - video_y and video_display.shape[1] <= self.video_width:
+            canvas[video_y:video_y+video_display.shape[0],
+                   video_x:video_x+video_display.shape[1]] = video_display
         
-        # 6. 渲染控制提示
-        self._render_controls(canvas)
+        # 5. 渲染粒子效果(覆盖整个画布,需在视频放置之后)
+        self._render_particles(canvas, fusion_ok, emotion)
         
-        return canvas
+        return canvas.copy() if copy else canvas
     
     def _render_video_area(
         self,
@@ -187,108 +335,225 @@ class AdvancedUIVisualizer:
         face_result: Optional[Dict]
     ) -> np.ndarray:
         """渲染视频区域"""
-        # 调整视频大小
-        target_height = self.video_height
-        target_width = int(frame.shape[1] * target_height / frame.shape[0])
+        # 调整视频大小(摄像头尺寸通常固定,目标尺寸只在变化时重新计算)
+        if self._video_source_shape != frame.shape[:2]:
+            self._update_video_geometry(*frame.shape[:2])
         
-        if target_width > self.video_width - 60:
-            target_width = self.video_width - 60
-            target_height = int(frame.shape[0] * target_width / frame.shape[1])
-        
-        video_resized = cv2.resize(frame, (target_width, target_height))
+        if self.use_opencl:
+            video_resized = cv2.resize(cv2.UMat(frame), self._video_target_size,
+                                       interpolation=cv2.INTER_LINEAR).get()
+        else:
+            video_resized = cv2.resize(frame, self._video_target_size,
+                                       interpolation=cv2.INTER_LINEAR)
         
         # 绘制关键点
         if landmarks is not None and len(landmarks) > 0:
-            scale_x = target_width / frame.shape[1]
-            scale_y = target_height / frame.shape[0]
+            # 一次性缩放所有关键点
+            scale = np.array([self._video_scale_x, self._video_scale_y])
+            pts = (np.asarray(landmarks)[:, :2] * scale).astype(np.int32)
             
-            # 绘制面部网格
-            for i, (x, y) in enumerate(landmarks):
-                x_scaled = int(x * scale_x)
-                y_scaled = int(y * scale_y)
-                
-                # 关键点
-                cv2.circle(video_resized, (x_scaled, y_scaled), 2,
-                          self.colors['accent_color'], -1)
+            # 关键点: 单点闭合折线按线宽画成实心圆,与 cv2.circle(半径2, 填充) 相同
+            cv2.polylines(video_resized, list(pts.reshape(-1, 1, 1, 2)), True,
+                          self._c_accent, 4)
             
             # 绘制连接线(简化版)
-            self._draw_face_mesh(video_resized, landmarks, scale_x, scale_y)
+            self._draw_face_mesh(video_resized, pts)
         
         # 添加边框和阴影效果
         bordered = self._add_border_and_shadow(video_resized)
         
         return bordered
     
-    def _draw_face_mesh(
-        self,
-        frame: np.ndarray,
-        landmarks: np.ndarray,
-        scale_x: float,
-        scale_y: float
-    ):
-        """绘制面部网格"""
-        # 定义主要连接(简化版)
-        connections = [
-            # 下巴轮廓
-            list(range(0, 16)),
-            # 左眉
-            list(range(17, 22)),
-            # 右眉
-            list(range(22, 27)),
-            # 鼻梁
-            list(range(27, 31)),
-            # 鼻子下部
-            list(range(31, 36)),
-            # 左眼
-            list(range(36, 42)) + [36],
-            # 右眼
-            list(range(42, 48)) + [42],
-            # 外嘴唇
-            list(range(48, 60)) + [48],
-            # 内嘴唇
-            list(range(60, 68)) + [60],
+    def _update_video_geometry(self, frame_height: int, frame_width: int):
+        """根据输入帧尺寸计算视频显示尺寸和关键点缩放比例"""
+        target_height = self.video_height
+        target_width = int(frame_width * target_height / frame_height)
+        
+        if target_width > self.video_width - 60:
+            target_width = self.video_width - 60
+            target_height = int(frame_height * target_width / frame_width)
+        
+        self._video_target_size = (target_width, target_height)
+        self._video_scale_x = target_width / frame_width
+        self._video_scale_y = target_height / frame_height
+        self._video_source_shape = (frame_height, frame_width)
+    
+    def _draw_face_mesh(self, frame: np.ndarray, pts: np.ndarray):
+        """绘制面部网格(pts为已缩放到显示尺寸的int32关键点坐标)"""
+        n = len(pts)
+        
+        polys = []
+        for idx in self._mesh_polylines:
+            # 关键点不足时截断到第一个越界索引之前
+            valid = idx < n
+            if not valid.all():
+                idx = idx[:valid.argmin()]
+            if len(idx) >= 2:
+                polys.append(pts[idx])
+        
+        if not polys:
+            return
+        
+        # 所有线条画在同一个叠加层上,只在网格包围盒内做一次半透明混合
+        all_pts = np.concatenate(polys)
+        x0, y0 = np.maximum(all_pts.min(axis=0) - 1, 0)
+        x1, y1 = all_pts.max(axis=0) + 2
+        roi = frame[y0:y1, x0:x1]
+        if roi.size == 0:
+            return
+        overlay = roi.copy()
+        offset = np.array([x0, y0], dtype=np.int32)
+        cv2.polylines(overlay, [p - offset for p in polys], False, self._c_secondary, 1, cv2.LINE_AA)
+        cv2.addWeighted(roi, 0.7, overlay, 0.3, 0, roi)
+    
+    def _precompute_theme_assets(self):
+        """预计算依赖当前主题的资源(初始化和切换主题时调用)"""
+        # 主题颜色缓存为属性,避免渲染路径上的字典查找
+        self._c_bg = self.colors['bg_color']
+        self._c_primary = self.colors['primary_color']
+        self._c_secondary = self.colors['secondary_color']
+        self._c_accent = self.colors['accent_color']
+        self._c_text = self.colors['text_color']
+        self._c_warning = self.colors['warning_color']
+        self._c_danger = self.colors['danger_color']
+        self._c_success = self.colors['success_color']
+        
+        # 颜色亮度查找表: 下标 i 对应亮度 i/255
+        levels = np.linspace(0, 1, 256)
+        self._glow_lut = [tuple(int(c * (0.5 + 0.5 * v)) for c in self._c_primary) for v in levels]
+        self._particle_lut = np.array([[int(c * v) for c in self._c_accent] for v in levels],
+                                      dtype=np.uint8)
+        self._radar_point_colors = np.tile(np.array(self._c_primary, dtype=np.uint8),
+                                           (len(self.radar_labels), 1))
+        
+        # 阴影渐变颜色: 第i个是向右下偏移i像素的那层阴影颜色
+        self._shadow_colors = [
+            tuple(int(c * (1 - (self.shadow_size - i) / self.shadow_size * 0.3)) for c in self._c_bg)
+            for i in range(self.shadow_size)
         ]
+        # 背景+阴影底图按视频尺寸在首次使用时绘制,主题变化后重建
+        self._shadow_base = None
+        
+        # 静态背景层
+        self._background_layer = self._build_background_layer()
+        
+        # 标题栏时间图块(依赖背景层,切换主题后在下一帧重建)
+        self._time_sec = -1
+        self._time_tile = None
+        
+        # 面板文字图块缓存(同上,依赖背景层)
+        self._text_cache = {}
         
-        for connection in connections:
-            for i in range(len(connection) - 1):
-                pt1_idx = connection[i]
-                pt2_idx = connection[i + 1]
-                
-                if pt1_idx < len(landmarks) and pt2_idx < len(landmarks):
-                    pt1 = (int(landmarks[pt1_idx][0] * scale_x),
-                           int(landmarks[pt1_idx][1] * scale_y))
-                    pt2 = (int(landmarks[pt2_idx][0] * scale_x),
-                           int(landmarks[pt2_idx][1] * scale_y))
-                    
-                    # 半透明线条
-                    overlay = frame.copy()
-                    cv2.line(overlay, pt1, pt2, self.colors['secondary_color'], 1)
-                    cv2.addWeighted(frame, 0.7, overlay, 0.3, 0, frame)
+        # 面板区域缓存 {面板名: (输入键, 区域像素)}
+        self._cached_regions = {}
+    
+    def _build_background_layer(self) -> np.ndarray:
+        """
+        构建静态背景层
+        
+        包含背景色、半透明面板底板、面板标题、趋势图网格、雷达图网格和标签、
+        标题栏和控制提示等不随帧变化的内容。render_frame每帧只需复制一次。
+        """
+        layer = np.full((self.height, self.width, 3), self._c_bg, dtype=np.uint8)
+        
+        # 半透明面板底板
+        for x, y, w, h in (self.emotion_panel_rect, self.trend_chart_rect,
+                           self.radar_panel_rect, self.waveform_rect):
+            self._blend_rect(layer, x, y, x + w, y + h, (40, 40, 50), 0.3)
+        
+        # 面板边框
+        for (x, y, w, h), color in ((self.emotion_panel_rect, self._c_primary),
+                                    (self.trend_chart_rect, self._c_primary),
+                                    (self.radar_panel_rect, self._c_primary),
+                                    (self.waveform_rect, self._c_secondary)):
+            cv2.rectangle(layer, (x, y), (x + w, y + h), color, 2)
+        
+        # 情绪面板标题
+        x, y, _, _ = self.emotion_panel_rect
+        cv2.putText(layer, "EMOTION & RISK ASSESSMENT", (x + 15, y + 30),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, self._c_text, 2)
+        
+        # 趋势图标题和网格
+        x, y, w, h = self.trend_chart_rect
+        cv2.putText(layer, "EMOTION TREND", (x + 15, y + 25),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, self._c_text, 2)
+        grid_color = (60, 60, 70)
+        for i in range(5):
+            grid_y = y + 40 + i * (h - 60) // 4
+            cv2.line(layer, (x + 15, grid_y), (x + w - 15, grid_y), grid_color, 1)
+        
+        # 雷达图标题、网格和标签
+        x, y, _, _ = self.radar_panel_rect
+        cv2.putText(layer, "HEALTH INDICATORS", (x + 15, y + 25),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, self._c_text, 2)
+        self._draw_radar_grid(layer, self.radar_center[0], self.radar_center[1],
+                              self.radar_radius, self.radar_labels)
+        
+        # 语音波形标题
+        x, y, _, _ = self.waveform_rect
+        cv2.putText(layer, "VOICE WAVEFORM", (x + 15, y + 25),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, self._c_text, 1)
+        
+        # 标题栏(半透明背景 + 标题)
+        self._blend_rect(layer, 0, 0, self.width, self.header_height, (30, 30, 40), 0.5)
+        cv2.putText(layer, "DEPRESSION DETECTION SYSTEM v4.0", (30, 28),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.8, self._c_primary, 2)
+        
+        # 控制提示
+        self._render_controls(layer)
+        
+        return layer
+    
+    @staticmethod
+    def _blend_rect(
+        canvas: np.ndarray,
+        x0: int,
+        y0: int,
+        x1: int,
+        y1: int,
+        color: Tuple[int, int, int],
+        alpha: float
+    ):
+        """
+        在矩形区域内原地混合纯色(等价于对整幅画布做 rectangle + addWeighted)
+        
+        矩形端点与 cv2.rectangle 一致,包含 (x1, y1)。
+        纯色一侧只是常量偏移,直接在ROI上做 roi*(1-alpha) + color*alpha,
+        不再构造同尺寸的纯色覆盖层;按 float32 计算并四舍五入,与 addWeighted 结果一致。
+        """
+        roi = canvas[max(y0, 0):y1 + 1, max(x0, 0):x1 + 1]
+        if roi.size == 0:
+            return
+        blended = roi.astype(np.float32)
+        blended *= np.float32(1 - alpha)
+        blended += np.float32(alpha) * np.array(color, dtype=np.float32)
+        np.rint(blended, out=blended)
+        np.copyto(roi, blended, casting='unsafe')
     
     def _add_border_and_shadow(self, frame: np.ndarray) -> np.ndarray:
         """添加边框和阴影"""
-        border_size = 3
-        shadow_size = 10
+        border_size = self.border_size
+        shadow_size = self.shadow_size
         
         # 创建带边框和阴影的画布
         h, w = frame.shape[:2]
         total_h = h + 2 * border_size + shadow_size
         total_w = w + 2 * border_size + shadow_size
         
-        canvas = np.full((total_h, total_w, 3), self.colors['bg_color'], dtype=np.uint8)
-        
-        # 阴影(渐变)
-        for i in range(shadow_size):
-            alpha = (shadow_size - i) / shadow_size * 0.3
-            color = tuple(int(c * (1 - alpha)) for c in self.colors['bg_color'])
-            cv2.rectangle(canvas,
-                         (border_size + i, border_size + i),
-                         (border_size + w + i, border_size + h + i),
-                         color, 1)
+        # 阴影(渐变): 逐层偏移的矩形轮廓只依赖视频尺寸和主题,画一次后每帧复制
+        base = self._shadow_base
+        if base is None or base.shape[:2] != (total_h, total_w):
+            base = np.full((total_h, total_w, 3), self._c_bg, dtype=np.uint8)
+            for i, color in enumerate(self._shadow_colors):
+                cv2.rectangle(base,
+                             (border_size + i, border_size + i),
+                             (border_size + w + i, border_size + h + i),
+                             color, 1)
+            self._shadow_base = base
+        canvas = base.copy()
         
         # 边框(发光效果)
-        glow_color = tuple(int(c * (0.5 + 0.5 * self.glow_intensity))
-                          for c in self.colors['primary_color'])
+        glow_color = self._glow_lut[int(self.glow_intensity * 255)]
         cv2.rectangle(canvas,
                      (0, 0),
                      (border_size + w, border_size + h),
@@ -299,69 +564,61 @@ class AdvancedUIVisualizer:
         
         return canvas
     
+    def _render_cached(self, canvas: np.ndarray, name: str, key, render, *args):
+        """
+        按输入键缓存面板区域
+        
+        键与上次相同时把缓存的区域像素贴回画布,否则调用 render 重绘并保存该区域。
+        雷达图和语音波形每帧叠加随机抖动,不走此缓存。
+        """
+        rows, cols = self._panel_regions[name]
+        cached = self._cached_regions.get(name)
+        if cached is not None and cached[0] == key:
+            canvas[rows, cols] = cached[1]
+            return
+        
+        render(canvas, *args)
+        self._cached_regions[name] = (key, canvas[rows, cols].copy())
+    
     def _render_emotion_panel(
         self,
         canvas: np.ndarray,
-        x: int,
-        y: int,
-        fusion_result: Optional[Dict]
-    ) -> int:
-        """渲染情绪和风险评估面板"""
-        panel_width = self.panel_width - 60
-        panel_height = 280
-        
-        # 半透明背景
-        overlay = canvas.copy()
-        cv2.rectangle(overlay, (x, y), (x + panel_width, y + panel_height),
-                     (40, 40, 50), -1)
-        cv2.addWeighted(canvas, 0.7, overlay, 0.3, 0, canvas)
-        
-        # 边框
-        cv2.rectangle(canvas, (x, y), (x + panel_width, y + panel_height),
-                     self.colors['primary_color'], 2)
-        
-        # 标题
-        cv2.putText(canvas, "EMOTION & RISK ASSESSMENT", (x + 15, y + 30),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, self.colors['text_color'], 2)
+        has_data: bool,
+        emotion: str,
+        confidence: float,
+        depression_score: float,
+        risk_label: str,
+        risk_level: str
+    ):
+        """渲染情绪和风险评估面板(底板、边框和标题在静态背景层中)"""
+        x, y, panel_width, panel_height = self.emotion_panel_rect
         
-        if fusion_result and fusion_result.get('status') == 'success':
-            emotion_data = fusion_result.get('emotion', {})
-            assessment = fusion_result.get('assessment', {})
-            
+        if has_data:
             # 情感信息
-            emotion = emotion_data.get('emotion', 'unknown').upper()
-            confidence = emotion_data.get('confidence', 0.0)
-            
-            cv2.putText(canvas, f"Emotion: {emotion}", (x + 15, y + 70),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.65, self.colors['text_color'], 2)
+            self._blit_text(canvas, f"Emotion: {emotion.upper()}", (x + 15, y + 70),
+                            0.65, self._c_text, 2)
             
             # 置信度条
             self._draw_progress_bar(canvas, x + 15, y + 85, panel_width - 30, 20,
                                    confidence, "Confidence")
             
             # 抑郁风险仪表盘
-            depression_score = fusion_result.get('depression_score', 0.0)
             self._draw_gauge(canvas, x + panel_width // 2, y + 180,
-                           80, depression_score, "Depression Risk")
+                           self.gauge_radius, depression_score, "Depression Risk")
             
             # 风险等级
-            risk_label = assessment.get('risk_label', '未知')
-            risk_level = assessment.get('risk_level', 'unknown')
-            
-            risk_color = self.colors['success_color']
+            risk_color = self._c_success
             if risk_level == 'medium':
-                risk_color = self.colors['warning_color']
+                risk_color = self._c_warning
             elif risk_level == 'high':
-                risk_color = self.colors['danger_color']
+                risk_color = self._c_danger
             
-            cv2.putText(canvas, f"Risk: {risk_label}", (x + 15, y + 260),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, risk_color, 2)
+            self._blit_text(canvas, f"Risk: {risk_label}", (x + 15, y + 260),
+                            0.6, risk_color, 2)
         
         else:
-            cv2.putText(canvas, "No Data Available", (x + 15, y + 70),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, self.colors['text_color'], 1)
-        
-        return y + panel_height
+            self._blit_text(canvas, "No Data Available", (x + 15, y + 70),
+                            0.6, self._c_text, 1)
     
     def _draw_progress_bar(
         self,
@@ -383,26 +640,25 @@ class AdvancedUIVisualizer:
         
         # 渐变色
         if value > 0.7:
-            color = self.colors['success_color']
+            color = self._c_success
         elif value > 0.4:
-            color = self.colors['warning_color']
+            color = self._c_warning
         else:
-            color = self.colors['danger_color']
+            color = self._c_danger
         
         cv2.rectangle(canvas, (x, y), (x + fill_width, y + height),
                      color, -1)
         
         # 边框
         cv2.rectangle(canvas, (x, y), (x + width, y + height),
-                     self.colors['secondary_color'], 1)
+                     self._c_secondary, 1)
         
         # 数值
         text = f"{value:.2f}"
         text_size = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.4, 1)[0]
         text_x = x + width + 10
         text_y = y + height // 2 + text_size[1] // 2
-        cv2.putText(canvas, text, (text_x, text_y),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.4, self.colors['text_color'], 1)
+        self._blit_text(canvas, text, (text_x, text_y), 0.4, self._c_text, 1)
     
     def _draw_gauge(
         self,
@@ -427,324 +683,282 @@ class AdvancedUIVisualizer:
         
         # 颜色根据值变化
         if value < 0.3:
-            arc_color = self.colors['success_color']
+            arc_color = self._c_success
         elif value < 0.6:
-            arc_color = self.colors['warning_color']
+            arc_color = self._c_warning
         else:
-            arc_color = self.colors['danger_color']
+            arc_color = self._c_danger
         
         cv2.ellipse(canvas, (center_x, center_y), (radius, radius),
                    0, start_angle, value_angle, arc_color, 8)
         
-        # 指针
-        pointer_angle = np.radians(value_angle)
-        pointer_x = int(center_x + radius * 0.8 * np.cos(pointer_angle))
-        pointer_y = int(center_y - radius * 0.8 * np.sin(pointer_angle))
+        # 指针(查表得到端点偏移)
+        if radius not in self._gauge_luts:
+            self._gauge_luts[radius] = self._build_gauge_lut(radius)
+        gauge_dx, gauge_dy = self._gauge_luts[radius]
+        idx = int(min(max(value, 0.0), 1.0) * 255)
+        pointer_x = center_x + int(gauge_dx[idx])
+        pointer_y = center_y + int(gauge_dy[idx])
         cv2.line(canvas, (center_x, center_y), (pointer_x, pointer_y),
-                self.colors['text_color'], 3)
+                self._c_text, 3)
         
         # 中心点
-        cv2.circle(canvas, (center_x, center_y), 5, self.colors['text_color'], -1)
+        cv2.circle(canvas, (center_x, center_y), 5, self._c_text, -1)
         
         # 数值
         text = f"{value:.2f}"
         text_size = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)[0]
         cv2.putText(canvas, text,
                    (center_x - text_size[0] // 2, center_y + 25),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, self.colors['text_color'], 1)
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, self._c_text, 1)
     
-    def _render_trend_chart(
-        self,
-        canvas: np.ndarray,
-        x: int,
-        y: int
-    ) -> int:
-        """渲染情绪趋势图"""
-        chart_width = self.panel_width - 60
-        chart_height = 200
-        
-        # 背景
-        overlay = canvas.copy()
-        cv2.rectangle(overlay, (x, y), (x + chart_width, y + chart_height),
-                     (40, 40, 50), -1)
-        cv2.addWeighted(canvas, 0.7, overlay, 0.3, 0, canvas)
-        
-        # 边框
-        cv2.rectangle(canvas, (x, y), (x + chart_width, y + chart_height),
-                     self.colors['primary_color'], 2)
-        
-        # 标题
-        cv2.putText(canvas, "EMOTION TREND", (x + 15, y + 25),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, self.colors['text_color'], 2)
-        
-        # 绘制网格
-        grid_color = (60, 60, 70)
-        for i in range(5):
-            grid_y = y + 40 + i * (chart_height - 60) // 4
-            cv2.line(canvas, (x + 15, grid_y), (x + chart_width - 15, grid_y),
-                    grid_color, 1)
+    @staticmethod
+    def _build_gauge_lut(radius: int) -> Tuple[np.ndarray, np.ndarray]:
+        """构建仪表盘指针端点偏移表(数值[0,1]量化为256级)"""
+        v = np.linspace(0, 1, 256)
+        angle = np.radians(180 - 180 * v)
+        gauge_dx = np.round(radius * 0.8 * np.cos(angle)).astype(np.int32)
+        gauge_dy = np.round(-radius * 0.8 * np.sin(angle)).astype(np.int32)
+        return gauge_dx, gauge_dy
+    
+    def _render_trend_chart(self, canvas: np.ndarray):
+        """渲染情绪趋势图(底板、边框、标题和网格在静态背景层中)"""
+        x, y, chart_width, chart_height = self.trend_chart_rect
         
         # 绘制曲线
-        if len(self.depression_history) > 1:
-            points = []
-            for i, value in enumerate(self.depression_history):
-                px = x + 15 + i * (chart_width - 30) // max(1, len(self.depression_history) - 1)
-                py = y + 40 + int((1 - value) * (chart_height - 60))
-                points.append((px, py))
+        n = len(self.depression_history)
+        if n > 1:
+            hist = np.fromiter(self.depression_history, dtype=np.float64, count=n)
+            xs = x + 15 + np.arange(n) * (chart_width - 30) // (n - 1)
+            ys = y + 40 + ((1 - hist) * (chart_height - 60)).astype(np.int32)
+            pts = np.stack([xs, ys], axis=1).astype(np.int32).reshape(-1, 1, 2)
             
             # 绘制线条
-            for i in range(len(points) - 1):
-                cv2.line(canvas, points[i], points[i + 1],
-                        self.colors['accent_color'], 2)
+            cv2.polylines(canvas, [pts], False, self._c_accent, 2, cv2.LINE_AA)
             
-            # 绘制点
-            for point in points:
-                cv2.circle(canvas, point, 3, self.colors['primary_color'], -1)
-        
-        return y + chart_height
+            # 绘制点: 单点闭合折线按线宽画成实心圆,与 cv2.circle(半径3, 填充) 相同
+            cv2.polylines(canvas, list(pts.reshape(-1, 1, 1, 2)), True,
+                          self._c_primary, 6)
     
     def _render_health_radar(
         self,
         canvas: np.ndarray,
-        x: int,
-        y: int,
-        fusion_result: Optional[Dict]
-    ) -> int:
-        """渲染健康指标雷达图"""
-        radar_size = 180
-        panel_width = self.panel_width - 60
-        panel_height = 240
-        
-        # 背景
-        overlay = canvas.copy()
-        cv2.rectangle(overlay, (x, y), (x + panel_width, y + panel_height),
-                     (40, 40, 50), -1)
-        cv2.addWeighted(canvas, 0.7, overlay, 0.3, 0, canvas)
-        
-        # 边框
-        cv2.rectangle(canvas, (x, y), (x + panel_width, y + panel_height),
-                     self.colors['primary_color'], 2)
-        
-        # 标题
-        cv2.putText(canvas, "HEALTH INDICATORS", (x + 15, y + 25),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, self.colors['text_color'], 2)
-        
-        # 雷达图中心
-        center_x = x + panel_width // 2
-        center_y = y + 140
-        
-        # 6个维度
-        dimensions = [
-            "Emotion",
-            "Energy",
-            "Social",
-            "Sleep",
-            "Appetite",
-            "Focus"
-        ]
-        
-        # 模拟数据(实际应从fusion_result获取)
-        if fusion_result and fusion_result.get('status') == 'success':
-            depression_score = fusion_result.get('depression_score', 0.5)
+        has_data: bool,
+        depression_score: float
+    ):
+        """渲染健康指标雷达图(底板、边框、标题、网格和标签在静态背景层中)"""
+        # 模拟数据(实际应从融合结果获取)
+        if has_data:
             # 抑郁分数越高,健康指标越低
             base_score = 1.0 - depression_score
-            values = [
-                base_score + np.random.uniform(-0.1, 0.1),
-                base_score + np.random.uniform(-0.15, 0.15),
-                base_score + np.random.uniform(-0.1, 0.1),
-                base_score + np.random.uniform(-0.2, 0.1),
-                base_score + np.random.uniform(-0.15, 0.15),
-                base_score + np.random.uniform(-0.1, 0.1),
-            ]
-            values = [max(0, min(1, v)) for v in values]
+            # 各维度在 [low, low + span) 内均匀扰动,原地写入预分配缓冲
+            values = self._radar_noise
+            self._rng.random(out=values)
+            values *= self._radar_noise_span
+            values += self._radar_noise_low + base_score
+            np.clip(values, 0, 1, out=values)
         else:
             values = [0.5] * 6
         
         # 绘制雷达图
-        self._draw_radar_chart(canvas, center_x, center_y, radar_size // 2,
-                              dimensions, values)
-        
-        return y + panel_height
+        self._draw_radar_chart(canvas, self.radar_center[0], self.radar_center[1],
+                              self.radar_radius, values)
     
-    def _draw_radar_chart(
+    def _draw_radar_grid(
         self,
         canvas: np.ndarray,
         center_x: int,
         center_y: int,
         radius: int,
-        labels: List[str],
-        values: List[float]
+        labels: List[str]
     ):
-        """绘制雷达图"""
-        n = len(labels)
-        angles = [2 * np.pi * i / n - np.pi / 2 for i in range(n)]
+        """绘制雷达图的静态部分(网格、轴线和标签)"""
+        ring_pts = _radar_points(center_x, center_y, radius, self._radar_cos, self._radar_sin,
+                                 np.zeros(len(labels)), self._radar_rings)[:-1]
         
         # 绘制背景网格
-        for r in [0.25, 0.5, 0.75, 1.0]:
-            points = []
-            for angle in angles:
-                x = int(center_x + radius * r * np.cos(angle))
-                y = int(center_y + radius * r * np.sin(angle))
-                points.append((x, y))
-            points.append(points[0])
-            
-            for i in range(len(points) - 1):
-                cv2.line(canvas, points[i], points[i + 1],
-                        (60, 60, 70), 1)
-        
-        # 绘制轴线
-        for angle in angles:
-            x = int(center_x + radius * np.cos(angle))
-            y = int(center_y + radius * np.sin(angle))
-            cv2.line(canvas, (center_x, center_y), (x, y),
-                    (60, 60, 70), 1)
-        
-        # 绘制数据多边形
-        data_points = []
-        for i, (angle, value) in enumerate(zip(angles, values)):
-            x = int(center_x + radius * value * np.cos(angle))
-            y = int(center_y + radius * value * np.sin(angle))
-            data_points.append((x, y))
-        
-        # 填充
-        if len(data_points) > 0:
-            pts = np.array(data_points, np.int32)
-            pts = pts.reshape((-1, 1, 2))
-            overlay = canvas.copy()
-            cv2.fillPoly(overlay, [pts], self.colors['accent_color'])
-            cv2.addWeighted(canvas, 0.7, overlay, 0.3, 0, canvas)
-            
-            # 边线
-            for i in range(len(data_points)):
-                cv2.line(canvas, data_points[i], data_points[(i + 1) % len(data_points)],
-                        self.colors['primary_color'], 2)
-            
-            # 数据点
-            for point in data_points:
-                cv2.circle(canvas, point, 4, self.colors['primary_color'], -1)
+        cv2.polylines(canvas, list(ring_pts), True, (60, 60, 70), 1)
+        
+        # 绘制轴线(最外层网格环即为各轴端点)
+        center = np.array([center_x, center_y], dtype=np.int32)
+        axes = [np.stack([center, end]) for end in ring_pts[-1]]
+        cv2.polylines(canvas, axes, False, (60, 60, 70), 1)
         
         # 标签
-        for i, (angle, label) in enumerate(zip(angles, labels)):
-            label_radius = radius + 25
-            x = int(center_x + label_radius * np.cos(angle))
-            y = int(center_y + label_radius * np.sin(angle))
+        label_radius = radius + 25
+        for cos_a, sin_a, label in zip(self._radar_cos, self._radar_sin, labels):
+            x = int(center_x + label_radius * cos_a)
+            y = int(center_y + label_radius * sin_a)
             
             text_size = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.4, 1)[0]
             text_x = x - text_size[0] // 2
             text_y = y + text_size[1] // 2
             
             cv2.putText(canvas, label, (text_x, text_y),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.4, self.colors['text_color'], 1)
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.4, self._c_text, 1)
+    
+    def _draw_radar_chart(
+        self,
+        canvas: np.ndarray,
+        center_x: int,
+        center_y: int,
+        radius: int,
+        values: List[float]
+    ):
+        """绘制雷达图数据多边形"""
+        pts = _radar_points(center_x, center_y, radius, self._radar_cos, self._radar_sin,
+                            np.asarray(values, dtype=np.float64), self._radar_rings[:0])[-1]
+        
+        # 填充(只在多边形包围盒与画布的交集内混合)
+        x, y, w, h = cv2.boundingRect(pts)
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, canvas.shape[1]), min(y + h, canvas.shape[0])
+        roi = canvas[y0:y1, x0:x1]
+        # 包围盒完全在画布外时跳过填充(边线和数据点仍可能有几个像素落在画布内)
+        if roi.size:
+            overlay = roi.copy()
+            cv2.fillPoly(overlay, [pts - np.array([x0, y0], dtype=np.int32)], self._c_accent)
+            cv2.addWeighted(roi, 0.7, overlay, 0.3, 0, roi)
+        
+        # 边线
+        cv2.polylines(canvas, [pts], True, self._c_primary, 2)
+        
+        # 数据点
+        stamp_disks_uint8(canvas, pts[:, 0], pts[:, 1], self._radar_point_mask,
+                          self._radar_point_colors)
     
     def _render_voice_waveform(
         self,
         canvas: np.ndarray,
         voice_result: Optional[Dict]
     ):
-        """渲染语音波形"""
-        waveform_height = 100
-        waveform_y = self.height - waveform_height - 80
-        waveform_x = 30
-        waveform_width = self.video_width
-        
-        # 背景
-        overlay = canvas.copy()
-        cv2.rectangle(overlay, (waveform_x, waveform_y),
-                     (waveform_x + waveform_width, waveform_y + waveform_height),
-                     (40, 40, 50), -1)
-        cv2.addWeighted(canvas, 0.7, overlay, 0.3, 0, canvas)
-        
-        # 边框
-        cv2.rectangle(canvas, (waveform_x, waveform_y),
-                     (waveform_x + waveform_width, waveform_y + waveform_height),
-                     self.colors['secondary_color'], 2)
-        
-        # 标题
-        cv2.putText(canvas, "VOICE WAVEFORM", (waveform_x + 15, waveform_y + 25),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, self.colors['text_color'], 1)
+        """渲染语音波形(底板、边框和标题在静态背景层中)"""
+        waveform_x, waveform_y, waveform_width, waveform_height = self.waveform_rect
         
         # 绘制波形(模拟)
         if voice_result and voice_result.get('status') == 'success':
-            # 模拟波形数据
-            num_samples = 200
-            samples = np.random.randn(num_samples) * 0.3
+            # 模拟波形数据(原地填充预分配缓冲)
+            samples = self._wave_buf
+            num_samples = len(samples)
+            self._rng.standard_normal(out=samples, dtype=np.float32)
+            samples *= 0.3
             
             center_y = waveform_y + waveform_height // 2
             
-            for i in range(num_samples - 1):
-                x1 = waveform_x + 15 + i * (waveform_width - 30) // num_samples
-                x2 = waveform_x + 15 + (i + 1) * (waveform_width - 30) // num_samples
-                y1 = int(center_y + samples[i] * (waveform_height - 40))
-                y2 = int(center_y + samples[i + 1] * (waveform_height - 40))
-                
-                cv2.line(canvas, (x1, y1), (x2, y2),
-                        self.colors['accent_color'], 1)
+            xs = waveform_x + 15 + np.arange(num_samples) * (waveform_width - 30) // num_samples
+            ys = (center_y + samples * (waveform_height - 40)).astype(np.int32)
+            pts = np.stack([xs, ys], axis=1).astype(np.int32).reshape(-1, 1, 2)
+            
+            cv2.polylines(canvas, [pts], False, self._c_accent, 1, cv2.LINE_AA)
     
     def _render_header(self, canvas: np.ndarray):
-        """渲染顶部标题栏"""
-        header_height = 40
-        
-        # 半透明背景
-        overlay = canvas.copy()
-        cv2.rectangle(overlay, (0, 0), (self.width, header_height),
-                     (30, 30, 40), -1)
-        cv2.addWeighted(canvas, 0.5, overlay, 0.5, 0, canvas)
-        
-        # 标题
-        title = "DEPRESSION DETECTION SYSTEM v4.0"
-        cv2.putText(canvas, title, (30, 28),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.8, self.colors['primary_color'], 2)
-        
-        # 时间
-        current_time = time.strftime("%Y-%m-%d %H:%M:%S")
-        time_size = cv2.getTextSize(current_time, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)[0]
-        cv2.putText(canvas, current_time, (self.width - time_size[0] - 30, 25),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, self.colors['text_color'], 1)
+        """渲染顶部标题栏(底色和标题在静态背景层中)"""
+        # 时间: 每秒只格式化和光栅化一次,其余帧直接贴图
+        sec = int(time.time())
+        if sec != self._time_sec:
+            self._time_sec = sec
+            current_time = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(sec))
+            time_size = cv2.getTextSize(current_time, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)[0]
+            self._time_tile = self._render_text_tile(
+                current_time, (self.width - time_size[0] - 30, 25), 0.5, self._c_text, 1)
+        
+        y0, x0, tile = self._time_tile
+        canvas[y0:y0 + tile.shape[0], x0:x0 + tile.shape[1]] = tile
+    
+    def _blit_text(
+        self,
+        canvas: np.ndarray,
+        text: str,
+        org: Tuple[int, int],
+        scale: float,
+        color: Tuple[int, int, int],
+        thickness: int
+    ):
+        """
+        绘制下方只有静态背景的文字,光栅化结果按内容缓存
+        
+        情绪、风险等级和数值文字取值有限,首次出现时光栅化,之后直接贴图。
+        """
+        key = (text, org, scale, color, thickness)
+        cached = self._text_cache.get(key)
+        if cached is None:
+            cached = self._text_cache[key] = self._render_text_tile(text, org, scale, color, thickness)
+        
+        y0, x0, tile = cached
+        canvas[y0:y0 + tile.shape[0], x0:x0 + tile.shape[1]] = tile
+    
+    def _render_text_tile(
+        self,
+        text: str,
+        org: Tuple[int, int],
+        scale: float,
+        color: Tuple[int, int, int],
+        thickness: int
+    ) -> Tuple[int, int, np.ndarray]:
+        """
+        在背景层的对应区域上预先光栅化一段文字
+        
+        仅适用于下方只有静态背景的文字。
+        
+        Returns:
+            (y0, x0, tile): 图块左上角坐标和图块像素
+        """
+        (text_w, text_h), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, scale, thickness)
+        margin = thickness + 1
+        y0 = max(org[1] - text_h - margin, 0)
+        x0 = max(org[0] - margin, 0)
+        y1 = min(org[1] + baseline + margin, self.height)
+        x1 = min(org[0] + text_w + margin, self.width)
+        
+        tile = self._background_layer[y0:y1, x0:x1].copy()
+        cv2.putText(tile, text, (org[0] - x0, org[1] - y0),
+                   cv2.FONT_HERSHEY_SIMPLEX, scale, color, thickness)
+        return y0, x0, tile
     
     def _render_particles(
         self,
         canvas: np.ndarray,
-        fusion_result: Optional[Dict]
+        has_data: bool,
+        emotion: str
     ):
         """渲染粒子效果"""
+        alive = self._p_alive
+        
         # 根据情绪生成粒子
-        if fusion_result and fusion_result.get('status') == 'success':
-            emotion = fusion_result.get('emotion', {}).get('emotion', 'neutral')
-            
-            # 随机生成新粒子
-            if len(self.particles) < self.max_particles and np.random.random() < 0.3:
-                particle = {
-                    'x': np.random.randint(0, self.width),
-                    'y': self.height,
-                    'vx': np.random.uniform(-1, 1),
-                    'vy': np.random.uniform(-3, -1) if emotion != 'sad' else np.random.uniform(0.5, 2),
-                    'life': 1.0,
-                    'color': self.colors['accent_color']
-                }
-                self.particles.append(particle)
-        
-        # 更新和绘制粒子
-        particles_to_remove = []
-        for particle in self.particles:
-            particle['x'] += particle['vx']
-            particle['y'] += particle['vy']
-            particle['life'] -= 0.02
-            
-            if particle['life'] <= 0 or particle['y'] < 0 or particle['y'] > self.height:
-                particles_to_remove.append(particle)
-            else:
-                # 绘制粒子
-                alpha = particle['life']
-                color = tuple(int(c * alpha) for c in particle['color'])
-                cv2.circle(canvas, (int(particle['x']), int(particle['y'])),
-                          2, color, -1)
+        if has_data:
+            # 随机生成新粒子(放入第一个空闲槽位)
+            rng = self._rng
+            if not alive.all() and rng.random() < 0.3:
+                slot = int(np.argmax(~alive))
+                self._p_x[slot] = rng.integers(0, self.width)
+                self._p_y[slot] = self.height
+                self._p_vx[slot] = rng.uniform(-1, 1)
+                self._p_vy[slot] = rng.uniform(-3, -1) if emotion != 'sad' else rng.uniform(0.5, 2)
+                self._p_life[slot] = 1.0
+                alive[slot] = True
+        
+        if not alive.any():
+            return
+        
+        # 批量更新粒子
+        self._p_x += self._p_vx
+        self._p_y += self._p_vy
+        self._p_life -= 0.02
         
         # 移除死亡粒子
-        for particle in particles_to_remove:
-            self.particles.remove(particle)
+        dead = (self._p_life <= 0) | (self._p_y < 0) | (self._p_y > self.height)
+        alive &= ~dead
+        
+        # 绘制存活粒子(一次内核调用绘制全部粒子)
+        idx = np.flatnonzero(alive)
+        stamp_disks_uint8(canvas,
+                          self._p_x[idx].astype(np.int32),
+                          self._p_y[idx].astype(np.int32),
+                          self._particle_mask,
+                          self._particle_lut[(self._p_life[idx] * 255).astype(np.intp)])
     
     def _render_controls(self, canvas: np.ndarray):
-        """渲染控制提示"""
+        """渲染控制提示(静态内容,绘制到背景层)"""
         controls_y = self.height - 40
         controls = [
             "Q: Quit",
@@ -756,9 +970,31 @@ class AdvancedUIVisualizer:
         x_offset = 30
         for control in controls:
             cv2.putText(canvas, control, (x_offset, controls_y),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.45, self.colors['text_color'], 1)
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.45, self._c_text, 1)
             x_offset += 150
     
+    def _get_pool(self) -> ThreadPoolExecutor:
+        """获取视频渲染线程池(按需创建)"""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ui-video')
+            # 未调用 close() 的实例在回收时也会关闭线程池
+            self._pool_finalizer = weakref.finalize(self, self._pool.shutdown, wait=False)
+        return self._pool
+    
+    def close(self):
+        """释放视频渲染线程(之后再渲染会重新创建)"""
+        if self._pool is not None:
+            self._pool_finalizer.detach()
+            self._pool.shutdown(wait=True)
+            self._pool = None
+            self._pool_finalizer = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
     def update_data(
         self,
         emotion: str,
@@ -769,12 +1005,14 @@ class AdvancedUIVisualizer:
         self.emotion_history.append(emotion)
         self.confidence_history.append(confidence)
         self.depression_history.append(depression_score)
+        self._history_version += 1
     
     def set_theme(self, theme: str):
         """切换主题"""
         if theme in self.themes:
             self.theme = theme
             self.colors = self.themes[theme]
+            self._precompute_theme_assets()
             print(f"✓ 主题已切换: {theme}")
         else:
             print(f"⚠ 未知主题: {theme}")
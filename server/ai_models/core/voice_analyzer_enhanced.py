@@ -17,11 +17,193 @@ import threading
 import queue
 import time
 from collections import deque
+from numpy.lib.stride_tricks import sliding_window_view
 from typing import Dict, Optional, List, Tuple
 import os
 import tempfile
 from scipy import signal
-from scipy.fft import fft, fftfreq
+from scipy.linalg import eigvals
+from scipy.ndimage import uniform_filter1d
+from scipy.fft import rfft, irfft, rfftfreq, dct, next_fast_len
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    # numba为可选依赖,不可用时以纯Python执行
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+
+try:
+    # pyfftw可用时实数FFT改用FFTW; 接口层缓存按输入形状生成的计划,
+    # 分析窗口稳定为3秒后不再重复规划
+    import pyfftw
+    from pyfftw.interfaces.scipy_fft import rfft, irfft
+    pyfftw.interfaces.cache.enable()
+    pyfftw.interfaces.cache.set_keepalive_time(5.0)
+    PYFFTW_AVAILABLE = True
+except ImportError:
+    # pyfftw为可选依赖,不可用时使用scipy.fft(pocketfft)
+    PYFFTW_AVAILABLE = False
+
+
+@njit(cache=True)
+def _levinson_durbin(r, order):
+    """Levinson-Durbin递归算法"""
+    a = np.zeros(order + 1)
+    a[0] = 1.0
+    e = r[0]
+    
+    for i in range(1, order + 1):
+        acc = 0.0
+        for j in range(i):
+            acc += a[j] * r[i - j]
+        lambda_val = -acc / e
+        
+        # a[j] += lambda * a[i-j],先保存旧系数避免原地覆盖
+        prev = a[:i + 1].copy()
+        for j in range(1, i + 1):
+            a[j] = prev[j] + lambda_val * prev[i - j]
+        e *= (1 - lambda_val ** 2)
+    
+    return a
+
+
+@njit(cache=True)
+def _pick_pitch(corr, min_period, max_period, sample_rate):
+    """
+    在归一化自相关 corr[min_period:max_period] 中取峰值并换算为基频
+    
+    峰值经三点抛物线插值得到亚采样精度的周期;相关性不足0.3
+    或基频超出50-500Hz时返回0。corr 至少包含 max_period+1 个点。
+    """
+    peak_idx = min_period
+    best = corr[min_period]
+    for k in range(min_period + 1, max_period):
+        if corr[k] > best:
+            best = corr[k]
+            peak_idx = k
+    
+    # 验证峰值
+    if best <= 0.3:  # 相关性阈值
+        return 0.0
+    
+    # 抛物线插值
+    left = corr[peak_idx - 1]
+    right = corr[peak_idx + 1]
+    denom = left - 2.0 * best + right
+    period = float(peak_idx)
+    if denom < 0.0:
+        period += 0.5 * (left - right) / denom
+    
+    pitch = sample_rate / period
+    
+    # 合理范围检查
+    if 50.0 <= pitch <= 500.0:
+        return pitch
+    return 0.0
+
+
+def _roots_small(a: np.ndarray) -> np.ndarray:
+    """
+    求多项式的根(伴随矩阵特征值,等价于 np.roots)
+    
+    a[0] 为首项系数且非零(LPC系数 a[0]=1),省去 np.roots 的系数检查和去零处理。
+    """
+    n = len(a) - 1
+    companion = np.zeros((n, n))
+    companion[0] = -a[1:] / a[0]
+    companion[1:, :-1] = np.eye(n - 1)
+    return eigvals(companion, check_finite=False, overwrite_a=True)
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _fused_basic(x):
+        """
+        单次遍历求最大绝对值、平方和与符号跳变量
+        
+        符号跳变量为 sum(|diff(sign(x))|),与 np.sign 的约定一致(0的符号为0)。
+        """
+        max_abs = 0.0
+        sum_sq = 0.0
+        sign_changes = 0
+        prev = 0
+        for i in range(x.shape[0]):
+            v = x[i]
+            a = abs(v)
+            if a > max_abs:
+                max_abs = a
+            sum_sq += v * v
+            cur = 1 if v > 0 else (-1 if v < 0 else 0)
+            if i > 0:
+                sign_changes += abs(cur - prev)
+            prev = cur
+        return max_abs, sum_sq, sign_changes
+else:
+    def _fused_basic(x):
+        """求最大绝对值、平方和与符号跳变量(numba不可用时的NumPy实现)"""
+        # 符号用int8表示(由两个布尔比较得到),差分和求和的中间数组只有float的1/4大小
+        sign = np.greater(x, 0).view(np.int8) - np.less(x, 0).view(np.int8)
+        sign_changes = int(np.abs(np.diff(sign)).sum())
+        return float(np.max(np.abs(x))), float(np.dot(x, x)), sign_changes
+
+
+class _RunningWindow:
+    """
+    定长滑动窗口,维护窗口内的和与平方和
+    
+    append 时减去被挤出的旧值,均值/标准差为 O(1);
+    每写满一轮按缓冲区重新求和,消除累计舍入误差。
+    """
+    
+    def __init__(self, maxlen: int):
+        self.maxlen = maxlen
+        self._buf = np.zeros(maxlen)
+        self._idx = 0
+        self._count = 0
+        self._sum = 0.0
+        self._sum_sq = 0.0
+    
+    def append(self, value: float):
+        value = float(value)
+        old = self._buf[self._idx]
+        if self._count == self.maxlen:
+            self._sum -= old
+            self._sum_sq -= old * old
+        else:
+            self._count += 1
+        
+        self._buf[self._idx] = value
+        self._sum += value
+        self._sum_sq += value * value
+        
+        self._idx = (self._idx + 1) % self.maxlen
+        if self._idx == 0:
+            self._sum = float(self._buf.sum())
+            self._sum_sq = float(np.dot(self._buf, self._buf))
+    
+    def mean(self) -> float:
+        return self._sum / self._count if self._count else 0.0
+    
+    def std(self) -> float:
+        if not self._count:
+            return 0.0
+        mean = self._sum / self._count
+        return float(np.sqrt(max(self._sum_sq / self._count - mean * mean, 0.0)))
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def __iter__(self):
+        """按写入顺序迭代窗口内的值"""
+        if self._count < self.maxlen:
+            return iter(self._buf[:self._count].tolist())
+        return iter(np.roll(self._buf, -self._idx).tolist())
 
 
 class EnhancedVoiceAnalyzer:
@@ -41,7 +223,8 @@ class EnhancedVoiceAnalyzer:
         sample_rate: int = 16000,
         chunk_size: int = 1024,
         channels: int = 1,
-        buffer_duration: int = 30
+        buffer_duration: int = 30,
+        slow_feature_interval: int = 5
     ):
         """
         初始化增强版语音分析器
@@ -51,11 +234,13 @@ class EnhancedVoiceAnalyzer:
             chunk_size: 音频块大小
             channels: 声道数
             buffer_duration: 缓冲区时长 (秒)
+            slow_feature_interval: MFCC/共振峰/振幅抖动的刷新间隔(分析次数),1表示每次都计算
         """
         self.sample_rate = sample_rate
         self.chunk_size = chunk_size
         self.channels = channels
         self.buffer_duration = buffer_duration
+        self.slow_feature_interval = max(1, int(slow_feature_interval))
         
         # PyAudio实例
         try:
@@ -70,13 +255,17 @@ class EnhancedVoiceAnalyzer:
         self.audio_queue = queue.Queue()
         self.record_thread = None
         
-        # 音频缓冲区
+        # 音频缓冲区(int16环形缓冲,录音线程写入、分析线程读取)
         max_samples = sample_rate * buffer_duration
-        self.audio_buffer = deque(maxlen=max_samples)
+        self._ring = np.zeros(max_samples, dtype=np.int16)
+        self._ring_idx = 0      # 下一个写入位置
+        self._ring_count = 0    # 已缓冲样本数(不超过缓冲区长度)
+        self._ring_lock = threading.Lock()
         
         # 特征历史 (扩展)
-        self.pitch_history = deque(maxlen=200)
-        self.energy_history = deque(maxlen=200)
+        self.pitch_history = _RunningWindow(200)
+        self.energy_history = _RunningWindow(200)
+        self._recent_pitch = _RunningWindow(20)  # 单调检测用的最近20个基频
         self.mfcc_history = deque(maxlen=100)
         self.formant_history = deque(maxlen=100)
         self.speech_rate_history = deque(maxlen=50)
@@ -97,11 +286,24 @@ class EnhancedVoiceAnalyzer:
             'total_frames': 0
         }
         
+        # 变化缓慢的特征按间隔刷新,其余调用复用上次结果
+        self._call_count = 0
+        self._slow_features = {}
+        
         # MFCC参数
         self.n_mfcc = 13
         self.n_fft = 2048
         self.hop_length = 512
         
+        # MFCC分帧参数(25ms帧长, 10ms帧移)及对应的汉明窗
+        self._frame_length = int(0.025 * sample_rate)
+        self._frame_step = int(0.010 * sample_rate)
+        self._hamming = np.hamming(self._frame_length).astype(np.float32)
+        
+        # 梅尔滤波器组只依赖采样率和FFT点数,预先生成
+        self.n_filters = 26
+        self._mel_filters = self._get_mel_filterbanks(self.n_filters).astype(np.float32)
+        
         print("✓ 增强版语音分析器已初始化")
     
     def start_recording(self) -> bool:
@@ -153,8 +355,7 @@ class EnhancedVoiceAnalyzer:
                     self.audio_queue.put(data)
                     
                     # 添加到缓冲区
-                    audio_array = np.frombuffer(data, dtype=np.int16).astype(np.float32)
-                    self.audio_buffer.extend(audio_array)
+                    self._write_ring(np.frombuffer(data, dtype=np.int16))
                     
                 except Exception as e:
                     print(f"⚠ 录音错误: {e}")
@@ -168,6 +369,33 @@ class EnhancedVoiceAnalyzer:
             print(f"⚠ 无法打开音频设备: {e}")
             self.is_recording = False
     
+    def _write_ring(self, samples: np.ndarray):
+        """写入环形缓冲区,超出容量时覆盖最旧的样本"""
+        size = len(self._ring)
+        samples = samples[-size:]
+        n = len(samples)
+        
+        with self._ring_lock:
+            start = self._ring_idx
+            end = start + n
+            if end <= size:
+                self._ring[start:end] = samples
+            else:
+                k = size - start
+                self._ring[start:] = samples[:k]
+                self._ring[:n - k] = samples[k:]
+            self._ring_idx = end % size
+            self._ring_count = min(self._ring_count + n, size)
+    
+    def _snapshot(self, samples: int) -> np.ndarray:
+        """按时间顺序取出最近 samples 个样本(不足时取全部),返回float32数组"""
+        with self._ring_lock:
+            n = min(samples, self._ring_count)
+            start = self._ring_idx - n
+            if start >= 0:
+                return self._ring[start:self._ring_idx].astype(np.float32)
+            return np.concatenate((self._ring[start:], self._ring[:self._ring_idx])).astype(np.float32)
+    
     def analyze_realtime(self) -> Dict:
         """
         实时分析当前音频
@@ -175,11 +403,13 @@ class EnhancedVoiceAnalyzer:
         Returns:
             分析结果字典
         """
-        if len(self.audio_buffer) < self.sample_rate:  # 至少1秒数据
+        if self._ring_count < self.sample_rate:  # 至少1秒数据
             return {'status': 'insufficient_data'}
         
+        self._call_count += 1
+        
         # 获取最近的音频数据
-        audio_data = np.array(list(self.audio_buffer)[-self.sample_rate * 3:])  # 最近3秒
+        audio_data = self._snapshot(self.sample_rate * 3)  # 最近3秒
         
         # 提取特征
         features = self._extract_features(audio_data)
@@ -217,28 +447,56 @@ class EnhancedVoiceAnalyzer:
         """
         features = {}
         
-        # 归一化
-        audio_data = audio_data / (np.max(np.abs(audio_data)) + 1e-6)
+        # 一次遍历得到归一化系数、能量和过零数(整条特征管线以float32计算)
+        audio_data = np.asarray(audio_data, dtype=np.float32)
+        max_abs, sum_sq, sign_changes = _fused_basic(audio_data)
+        scale = max_abs + 1e-6
         
-        # 1. 基础特征
-        features['energy'] = float(np.sqrt(np.mean(audio_data ** 2)))
-        features['zero_crossing_rate'] = float(
-            np.sum(np.abs(np.diff(np.sign(audio_data)))) / (2 * len(audio_data))
-        )
+        # 归一化
+        audio_data = audio_data / np.float32(scale)
+        
+        # 1. 基础特征(按归一化后的信号计算)
+        features['energy'] = float(np.sqrt(sum_sq / len(audio_data)) / scale)
+        features['zero_crossing_rate'] = float(sign_changes / (2 * len(audio_data)))
+        
+        # 非语音段(与下方语音活动检测同一阈值)跳过其余特征提取
+        if features['energy'] <= 0.01:
+            features.update({
+                'pitch': 0.0,
+                'mfcc': np.zeros(self.n_mfcc, dtype=np.float32),
+                'mfcc_mean': 0.0,
+                'mfcc_std': 0.0,
+                'formants': [0.0, 0.0, 0.0],
+                'spectral_centroid': 0.0,
+                'spectral_bandwidth': 0.0,
+                'spectral_rolloff': 0.0,
+                'jitter': 0.0,
+                'shimmer': 0.0,
+                'is_speech': False
+            })
+            return features
         
         # 2. 基频 (Pitch)
         pitch = self._estimate_pitch_advanced(audio_data)
         features['pitch'] = pitch
         
+        # MFCC、共振峰和振幅抖动是较稳定的统计量,每 slow_feature_interval 次分析刷新一次
+        if not self._slow_features or self._call_count % self.slow_feature_interval == 0:
+            self._slow_features = {
+                'mfcc': self._extract_mfcc(audio_data),
+                'formants': self._extract_formants(audio_data),
+                'shimmer': self._calculate_shimmer(audio_data),
+            }
+        slow_features = self._slow_features
+        
         # 3. MFCC特征
-        mfcc = self._extract_mfcc(audio_data)
+        mfcc = slow_features['mfcc']
         features['mfcc'] = mfcc
         features['mfcc_mean'] = float(np.mean(mfcc))
         features['mfcc_std'] = float(np.std(mfcc))
         
         # 4. 共振峰频率
-        formants = self._extract_formants(audio_data)
-        features['formants'] = formants
+        features['formants'] = list(slow_features['formants'])
         
         # 5. 频谱特征
         spectral_features = self._extract_spectral_features(audio_data)
@@ -249,8 +507,7 @@ class EnhancedVoiceAnalyzer:
         features['jitter'] = jitter
         
         # 7. 振幅抖动 (Shimmer)
-        shimmer = self._calculate_shimmer(audio_data)
-        features['shimmer'] = shimmer
+        features['shimmer'] = slow_features['shimmer']
         
         # 8. 语音活动检测
         features['is_speech'] = features['energy'] > 0.01
@@ -262,33 +519,32 @@ class EnhancedVoiceAnalyzer:
         高级基频估计
         使用自相关和倒谱分析
         """
-        # 自相关方法
-        corr = np.correlate(audio_data, audio_data, mode='full')
-        corr = corr[len(corr)//2:]
-        
-        # 归一化
-        corr = corr / (corr[0] + 1e-6)
-        
         # 寻找峰值
         min_period = int(self.sample_rate / 500)  # 最高500Hz
         max_period = int(self.sample_rate / 50)   # 最低50Hz
         
-        if len(corr) < max_period:
+        if len(audio_data) < max_period:
             return 0.0
         
-        # 在有效范围内寻找峰值
-        search_range = corr[min_period:max_period]
-        peak_idx = np.argmax(search_range) + min_period
+        # 自相关方法
+        corr = self._autocorr(audio_data, max_period)
         
-        # 验证峰值
-        if corr[peak_idx] > 0.3:  # 相关性阈值
-            pitch = self.sample_rate / peak_idx
-            
-            # 合理范围检查
-            if 50 <= pitch <= 500:
-                return float(pitch)
+        # 归一化
+        corr = corr / (corr[0] + 1e-6)
         
-        return 0.0
+        # 在有效范围内寻找峰值并插值
+        return float(_pick_pitch(corr, min_period, max_period, float(self.sample_rate)))
+    
+    def _autocorr(self, x: np.ndarray, max_lag: int) -> np.ndarray:
+        """
+        FFT计算自相关(非负延迟 0..max_lag)
+        
+        补零到 2N-1 以上避免循环相关混叠,结果与
+        np.correlate(x, x, 'full') 的后半段一致,复杂度 O(N log N)。
+        """
+        n = next_fast_len(2 * len(x) - 1, real=True)
+        spectrum = rfft(x, n)
+        return irfft(spectrum * np.conj(spectrum), n)[:max_lag + 1]
     
     def _extract_mfcc(self, audio_data: np.ndarray) -> np.ndarray:
         """
@@ -302,39 +558,27 @@ class EnhancedVoiceAnalyzer:
             audio_data[1:] - pre_emphasis * audio_data[:-1]
         )
         
-        # 分帧
-        frame_length = int(0.025 * self.sample_rate)  # 25ms
-        frame_step = int(0.010 * self.sample_rate)    # 10ms
-        
-        num_frames = 1 + int((len(emphasized_audio) - frame_length) / frame_step)
-        
-        if num_frames <= 0:
+        # 分帧(步长视图,不复制数据)
+        if len(emphasized_audio) < self._frame_length:
             return np.zeros(self.n_mfcc)
         
-        frames = np.zeros((num_frames, frame_length))
-        for i in range(num_frames):
-            start = i * frame_step
-            end = start + frame_length
-            if end <= len(emphasized_audio):
-                frames[i] = emphasized_audio[start:end]
+        frames = sliding_window_view(emphasized_audio, self._frame_length)[::self._frame_step]
         
-        # 加窗
-        frames *= np.hamming(frame_length)
+        # 加窗(同时生成连续的帧数组供FFT使用)
+        frames = frames * self._hamming
         
         # FFT
-        mag_frames = np.absolute(np.fft.rfft(frames, self.n_fft))
+        # 各帧相互独立,批量变换分配到所有核心;frames 是加窗后的私有副本,可原地覆盖
+        mag_frames = np.absolute(rfft(frames, self.n_fft, axis=1, overwrite_x=True, workers=-1))
         pow_frames = ((1.0 / self.n_fft) * (mag_frames ** 2))
         
         # 梅尔滤波器组
-        n_filters = 26
-        mel_filters = self._get_mel_filterbanks(n_filters)
-        
-        filter_banks = np.dot(pow_frames, mel_filters.T)
-        filter_banks = np.where(filter_banks == 0, np.finfo(float).eps, filter_banks)
+        filter_banks = np.dot(pow_frames, self._mel_filters.T)
+        filter_banks = np.where(filter_banks == 0, np.float32(np.finfo(float).eps), filter_banks)
         filter_banks = 20 * np.log10(filter_banks)
         
-        # DCT
-        mfcc = self._dct(filter_banks, self.n_mfcc)
+        # DCT (scipy的未归一化DCT-II为 2*sum(x*cos(...)),乘0.5保持原有系数尺度)
+        mfcc = dct(filter_banks, type=2, axis=1)[:, :self.n_mfcc] * 0.5
         
         # 平均MFCC
         mfcc_mean = np.mean(mfcc, axis=0)
@@ -351,30 +595,20 @@ class EnhancedVoiceAnalyzer:
         
         bin_points = np.floor((self.n_fft + 1) * hz_points / self.sample_rate).astype(int)
         
-        fbank = np.zeros((n_filters, int(self.n_fft / 2 + 1)))
+        # 每行一个三角滤波器: [left, center) 上升沿, [center, right) 下降沿
+        left = bin_points[:-2, np.newaxis]
+        center = bin_points[1:-1, np.newaxis]
+        right = bin_points[2:, np.newaxis]
+        j = np.arange(int(self.n_fft / 2 + 1))[np.newaxis, :]
         
-        for i in range(1, n_filters + 1):
-            left = bin_points[i - 1]
-            center = bin_points[i]
-            right = bin_points[i + 1]
-            
-            for j in range(left, center):
-                fbank[i - 1, j] = (j - left) / (center - left)
-            for j in range(center, right):
-                fbank[i - 1, j] = (right - j) / (right - center)
+        # 区间为空时分母不参与结果,取1避免除零
+        rising = (j - left) / np.maximum(center - left, 1)
+        falling = (right - j) / np.maximum(right - center, 1)
         
-        return fbank
-    
-    def _dct(self, x: np.ndarray, n_coeff: int) -> np.ndarray:
-        """离散余弦变换"""
-        N = x.shape[1]
-        result = np.zeros((x.shape[0], n_coeff))
+        fbank = np.where((j >= left) & (j < center), rising, 0.0)
+        fbank += np.where((j >= center) & (j < right), falling, 0.0)
         
-        for k in range(n_coeff):
-            for n in range(N):
-                result[:, k] += x[:, n] * np.cos(np.pi * k * (2 * n + 1) / (2 * N))
-        
-        return result
+        return fbank
     
     def _extract_formants(self, audio_data: np.ndarray) -> List[float]:
         """
@@ -385,53 +619,38 @@ class EnhancedVoiceAnalyzer:
         order = 12
         
         # 自相关
-        r = np.correlate(audio_data, audio_data, mode='full')
-        r = r[len(r)//2:len(r)//2 + order + 1]
+        r = self._autocorr(audio_data, order)
         
         # Levinson-Durbin算法
         try:
-            a = self._levinson_durbin(r, order)
+            a = _levinson_durbin(r.astype(np.float64), order)
             
-            # 求根找共振峰
-            roots = np.roots(a)
-            roots = roots[np.imag(roots) >= 0]
+            # 静音等退化输入会得到非有限系数
+            if not np.all(np.isfinite(a)):
+                return [0.0, 0.0, 0.0]
             
-            # 转换为频率
-            angles = np.arctan2(np.imag(roots), np.real(roots))
-            freqs = angles * (self.sample_rate / (2 * np.pi))
+            # 求根找共振峰
+            roots = _roots_small(a)
+            roots = roots[roots.imag >= 0]
             
-            # 排序并选择前3个
-            freqs = sorted(freqs)
-            formants = freqs[:3] if len(freqs) >= 3 else freqs + [0] * (3 - len(freqs))
+            # 转换为频率,排序并选择前3个(不足补0)
+            freqs = np.sort(np.angle(roots)) * (self.sample_rate / (2 * np.pi))
+            formants = [0.0, 0.0, 0.0]
+            formants[:len(freqs[:3])] = freqs[:3].tolist()
             
-            return [float(f) for f in formants]
+            return formants
         
         except:
             return [0.0, 0.0, 0.0]
     
-    def _levinson_durbin(self, r: np.ndarray, order: int) -> np.ndarray:
-        """Levinson-Durbin递归算法"""
-        a = np.zeros(order + 1)
-        a[0] = 1.0
-        e = r[0]
-        
-        for i in range(1, order + 1):
-            lambda_val = -np.sum(a[:i] * r[i:0:-1]) / e
-            a[1:i+1] += lambda_val * a[i-1::-1]
-            a[i] = lambda_val
-            e *= (1 - lambda_val ** 2)
-        
-        return a
-    
     def _extract_spectral_features(self, audio_data: np.ndarray) -> Dict:
         """提取频谱特征"""
-        # FFT
-        fft_vals = np.abs(fft(audio_data))
-        fft_freqs = fftfreq(len(audio_data), 1/self.sample_rate)
+        # 实数FFT,按原始长度变换(补零会改变频点位置和幅度谱形状,特征随之偏移)
+        n = len(audio_data)
         
-        # 只取正频率
-        positive_freqs = fft_freqs[:len(fft_freqs)//2]
-        positive_fft = fft_vals[:len(fft_vals)//2]
+        # 只取正频率(与完整FFT取前半段一致,不含Nyquist频点)
+        positive_fft = np.abs(rfft(audio_data, n))[:n // 2]
+        positive_freqs = rfftfreq(n, 1 / self.sample_rate)[:n // 2]
         
         # 频谱质心
         spectral_centroid = np.sum(positive_freqs * positive_fft) / (np.sum(positive_fft) + 1e-6)
@@ -443,9 +662,10 @@ class EnhancedVoiceAnalyzer:
         )
         
         # 频谱滚降点
+        # 累积和单调不减,二分查找第一个达到85%能量的频点
         cumsum = np.cumsum(positive_fft)
-        rolloff_idx = np.where(cumsum >= 0.85 * cumsum[-1])[0]
-        spectral_rolloff = positive_freqs[rolloff_idx[0]] if len(rolloff_idx) > 0 else 0
+        rolloff_idx = int(np.searchsorted(cumsum, 0.85 * cumsum[-1]))
+        spectral_rolloff = positive_freqs[rolloff_idx] if rolloff_idx < len(positive_freqs) else 0
         
         return {
             'spectral_centroid': float(spectral_centroid),
@@ -462,11 +682,9 @@ class EnhancedVoiceAnalyzer:
         if num_frames < 2:
             return 0.0
         
-        frame_energies = []
-        for i in range(num_frames):
-            frame = audio_data[i*frame_length:(i+1)*frame_length]
-            energy = np.sqrt(np.mean(frame ** 2))
-            frame_energies.append(energy)
+        # 分帧后一次性求各帧RMS能量(einsum融合平方与求和)
+        frames = audio_data[:num_frames * frame_length].reshape(num_frames, frame_length)
+        frame_energies = np.sqrt(np.einsum('ij,ij->i', frames, frames) / frame_length)
         
         # 计算相邻帧能量差异
         jitter = np.std(np.diff(frame_energies)) / (np.mean(frame_energies) + 1e-6)
@@ -476,11 +694,10 @@ class EnhancedVoiceAnalyzer:
     def _calculate_shimmer(self, audio_data: np.ndarray) -> float:
         """计算振幅抖动(Shimmer)"""
         # 简化版本: 基于振幅包络变化
-        # 使用Hilbert变换获取包络
-        from scipy.signal import hilbert
-        
-        analytic_signal = hilbert(audio_data)
-        amplitude_envelope = np.abs(analytic_signal)
+        # 整流后滑动平均得到包络,窗口20ms覆盖最低基频(50Hz)的一个周期,
+        # 平滑掉基频波纹,只保留振幅起伏
+        window = max(1, int(0.02 * self.sample_rate))
+        amplitude_envelope = uniform_filter1d(np.abs(audio_data), window)
         
         # 计算包络变化
         shimmer = np.std(amplitude_envelope) / (np.mean(amplitude_envelope) + 1e-6)
@@ -578,7 +795,7 @@ class EnhancedVoiceAnalyzer:
         
         # 3. 单调(基于音调历史)
         if len(self.pitch_history) > 10:
-            pitch_std = np.std(list(self.pitch_history)[-20:])
+            pitch_std = self._recent_pitch.std()
             if pitch_std < 10:  # 音调变化很小
                 indicators['monotone'] = min(1.0, (10 - pitch_std) / 10)
         
@@ -631,6 +848,7 @@ class EnhancedVoiceAnalyzer:
         """更新特征历史"""
         if features.get('pitch', 0) > 0:
             self.pitch_history.append(features['pitch'])
+            self._recent_pitch.append(features['pitch'])
         
         self.energy_history.append(features.get('energy', 0))
         
@@ -661,12 +879,12 @@ class EnhancedVoiceAnalyzer:
         }
         
         if len(self.pitch_history) > 0:
-            stats['pitch_mean'] = float(np.mean(self.pitch_history))
-            stats['pitch_std'] = float(np.std(self.pitch_history))
+            stats['pitch_mean'] = self.pitch_history.mean()
+            stats['pitch_std'] = self.pitch_history.std()
         
         if len(self.energy_history) > 0:
-            stats['energy_mean'] = float(np.mean(self.energy_history))
-            stats['energy_std'] = float(np.std(self.energy_history))
+            stats['energy_mean'] = self.energy_history.mean()
+            stats['energy_std'] = self.energy_history.std()
         
         # 抑郁特征比例
         if self.depression_features['total_frames'] > 0:
@@ -690,10 +908,10 @@ class EnhancedVoiceAnalyzer:
             波形数据数组
         """
         samples = int(self.sample_rate * duration)
-        if len(self.audio_buffer) < samples:
+        if self._ring_count < samples:
             return np.zeros(samples)
         
-        return np.array(list(self.audio_buffer)[-samples:])
+        return self._snapshot(samples)
     
     def cleanup(self):
         """清理资源"""
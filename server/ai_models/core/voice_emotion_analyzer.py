@@ -6,13 +6,97 @@
 import numpy as np
 import pyaudio
 import wave
-import threading
-import queue
 import time
 from collections import deque
 from typing import Dict, Optional, List, Tuple
 import os
 import tempfile
+from scipy.fft import rfft, irfft, next_fast_len
+from scipy.signal import find_peaks
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    # numba为可选依赖,不可用时使用NumPy实现
+    NUMBA_AVAILABLE = False
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    # pyahocorasick为可选依赖,不可用时逐个关键词做子串查找
+    AHOCORASICK_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True)
+    def _fused_features(buf):
+        """
+        单次遍历int16音频块,求能量(RMS)、过零率与最大绝对值
+        
+        int16的符号即最高位,相邻采样异或结果为负即发生一次过零,
+        过零率为过零次数除以相邻采样对数 N-1(0按正数计)。
+        平方和在int64中精确累加,全程不转换为浮点数组。
+        """
+        n = buf.shape[0]
+        sum_sq = 0
+        crossings = 0
+        max_abs = 0
+        prev = np.int64(buf[0]) if n > 0 else 0
+        for i in range(n):
+            v = np.int64(buf[i])
+            sum_sq += v * v
+            a = abs(v)
+            if a > max_abs:
+                max_abs = a
+            crossings += (v ^ prev) < 0
+            prev = v
+        return np.sqrt(sum_sq / n), crossings / max(n - 1, 1), float(max_abs)
+else:
+    def _fused_features(buf):
+        """求能量(RMS)、过零率与最大绝对值(numba不可用时的NumPy实现)"""
+        # 平方和用int64精确累加(int32会溢出)
+        wide = buf.astype(np.int64)
+        sum_sq = int(np.dot(wide, wide))
+        # 直接在int16上异或比较符号位,不生成float中间数组
+        crossings = int(np.count_nonzero((buf[1:] ^ buf[:-1]) < 0))
+        # 不对int16取abs(-32768会溢出)
+        max_abs = max(int(buf.max()), -int(buf.min()))
+        return (float(np.sqrt(sum_sq / len(buf))), crossings / max(len(buf) - 1, 1),
+                float(max_abs))
+
+
+class _HistoryBuffer:
+    """
+    定长特征历史(预分配float32环形缓冲区)
+    
+    替代 deque(maxlen=N): 写入只做一次数组赋值,求均值时直接在
+    连续数组上计算,不再把Python浮点对象逐个转换为ndarray。
+    """
+    
+    def __init__(self, maxlen: int):
+        self.maxlen = maxlen
+        self._buf = np.zeros(maxlen, dtype=np.float32)
+        self._idx = 0
+        self._count = 0
+    
+    def append(self, value: float):
+        self._buf[self._idx] = value
+        self._idx = (self._idx + 1) % self.maxlen
+        self._count = min(self._count + 1, self.maxlen)
+    
+    def mean(self) -> float:
+        return float(self._buf[:self._count].mean()) if self._count else 0.0
+    
+    def values(self) -> np.ndarray:
+        """按时间顺序返回缓冲区内的值"""
+        if self._count < self.maxlen:
+            return self._buf[:self._count]
+        return np.roll(self._buf, -self._idx)
+    
+    def __len__(self) -> int:
+        return self._count
 
 
 class VoiceEmotionAnalyzer:
@@ -59,18 +143,33 @@ class VoiceEmotionAnalyzer:
         
         # 录音控制
         self.is_recording = False
-        self.audio_queue = queue.Queue()
-        self.record_thread = None
+        self.stream = None
+        # 录音回调写入、分析端读取的音频块缓冲(deque两端操作线程安全,无需加锁)
+        self.audio_queue = deque()
+        self._chunk_seconds = chunk_size / sample_rate
+        
+        # 基频上限500Hz,估计音调前降采样到约8kHz
+        self._pitch_decimation = max(1, sample_rate // 8000)
         
         # 语音特征历史
-        self.pitch_history = deque(maxlen=100)
-        self.energy_history = deque(maxlen=100)
-        self.speech_rate_history = deque(maxlen=100)
-        self.pause_ratio_history = deque(maxlen=100)
+        self.pitch_history = _HistoryBuffer(100)
+        self.energy_history = _HistoryBuffer(100)
+        self.speech_rate_history = _HistoryBuffer(100)
+        self.pause_ratio_history = _HistoryBuffer(100)
         
         # 情感标签
         self.emotion_labels = ['neutral', 'happy', 'sad', 'angry', 'anxious']
         
+        # 抑郁相关关键词
+        self.depression_keywords = {
+            'negative': ['累', '疲惫', '无聊', '无趣', '没意思', '没劲', '烦', '难受'],
+            'hopeless': ['没希望', '没用', '算了', '放弃', '无所谓', '不想'],
+            'isolation': ['孤独', '一个人', '没人', '不想说', '不想见'],
+            'sleep': ['失眠', '睡不着', '睡不好', '做梦', '早醒'],
+            'appetite': ['不想吃', '没胃口', '吃不下'],
+        }
+        self._keyword_automaton = self._build_keyword_automaton()
+        
         print("✓ 语音情感分析器已初始化")
     
     def start_recording(self):
@@ -78,43 +177,60 @@ class VoiceEmotionAnalyzer:
         if self.is_recording:
             return
         
+        try:
+            # 回调模式: PortAudio线程直接把音频块追加到缓冲,录音路径上没有阻塞读和队列锁
+            self.stream = self.audio.open(
+                format=pyaudio.paInt16,
+                channels=self.channels,
+                rate=self.sample_rate,
+                input=True,
+                frames_per_buffer=self.chunk_size,
+                stream_callback=self._on_audio,
+                start=True
+            )
+        except Exception as e:
+            print(f"无法打开音频设备: {e}")
+            return
+        
         self.is_recording = True
-        self.record_thread = threading.Thread(target=self._record_audio, daemon=True)
-        self.record_thread.start()
         print("✓ 开始录音")
     
     def stop_recording(self):
         """停止录音"""
         self.is_recording = False
-        if self.record_thread:
-            self.record_thread.join(timeout=2)
+        if self.stream is not None:
+            try:
+                self.stream.stop_stream()
+                self.stream.close()
+            except Exception as e:
+                print(f"录音错误: {e}")
+            self.stream = None
         print("✓ 停止录音")
     
-    def _record_audio(self):
-        """录音线程"""
-        try:
-            stream = self.audio.open(
-                format=pyaudio.paInt16,
-                channels=self.channels,
-                rate=self.sample_rate,
-                input=True,
-                frames_per_buffer=self.chunk_size
-            )
-            
-            while self.is_recording:
-                try:
-                    data = stream.read(self.chunk_size, exception_on_overflow=False)
-                    self.audio_queue.put(data)
-                except Exception as e:
-                    print(f"录音错误: {e}")
-                    break
-            
-            stream.stop_stream()
-            stream.close()
+    def _on_audio(self, in_data, frame_count, time_info, status):
+        """录音回调(在PortAudio线程中执行)"""
+        self.audio_queue.append(in_data)
+        return (None, pyaudio.paContinue)
+    
+    def _pop_chunk(self, timeout: float) -> Optional[bytes]:
+        """
+        取出最早的音频块
         
-        except Exception as e:
-            print(f"无法打开音频设备: {e}")
-            self.is_recording = False
+        Args:
+            timeout: 缓冲为空时最多等待的秒数
+            
+        Returns:
+            音频块,超时返回None
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return self.audio_queue.popleft()
+            except IndexError:
+                if time.monotonic() >= deadline:
+                    return None
+                # 以 1/4 块时长轮询,下一块到达后很快被取走
+                time.sleep(self._chunk_seconds / 4)
     
     def analyze_audio_chunk(self, audio_data: bytes) -> Dict:
         """
@@ -127,22 +243,23 @@ class VoiceEmotionAnalyzer:
             语音特征字典
         """
         # 转换为numpy数组
-        audio_array = np.frombuffer(audio_data, dtype=np.int16).astype(np.float32)
+        samples = np.frombuffer(audio_data, dtype=np.int16)
         
         # 提取特征
         features = {}
         
+        # 一次遍历得到能量、过零率和归一化用的最大绝对值
+        energy, zcr, max_abs = _fused_features(samples)
+        
         # 1. 能量 (音量)
-        energy = np.sqrt(np.mean(audio_array ** 2))
         features['energy'] = float(energy)
         self.energy_history.append(energy)
         
         # 2. 过零率 (语音活动检测)
-        zero_crossings = np.sum(np.abs(np.diff(np.sign(audio_array)))) / 2
-        features['zero_crossing_rate'] = float(zero_crossings / len(audio_array))
+        features['zero_crossing_rate'] = float(zcr)
         
         # 3. 基频估计 (音调)
-        pitch = self._estimate_pitch(audio_array)
+        pitch = self._estimate_pitch(samples, max_abs)
         features['pitch'] = pitch
         if pitch > 0:
             self.pitch_history.append(pitch)
@@ -153,34 +270,77 @@ class VoiceEmotionAnalyzer:
         
         return features
     
-    def _estimate_pitch(self, audio_array: np.ndarray) -> float:
+    def _estimate_pitch(self, audio_array: np.ndarray, max_abs: Optional[float] = None) -> float:
         """
         估计基频(音调)
         使用自相关方法
+        
+        Args:
+            audio_array: 音频数据(int16或浮点)
+            max_abs: 已知的最大绝对值(省略时重新计算)
         """
-        # 归一化
-        audio_array = audio_array / (np.max(np.abs(audio_array)) + 1e-6)
+        if max_abs is None:
+            max_abs = max(float(audio_array.max()), -float(audio_array.min()))
         
-        # 自相关
-        corr = np.correlate(audio_array, audio_array, mode='full')
-        corr = corr[len(corr)//2:]
+        # 降采样: 每q个采样取平均(兼作简单的抗混叠低通),FFT长度和搜索范围都缩小q倍;
+        # int16输入只有降采样后的短数组转换为float32
+        q = self._pitch_decimation
+        if q > 1:
+            n = len(audio_array) // q * q
+            audio_array = audio_array[:n].reshape(-1, q).mean(axis=1, dtype=np.float32)
+        sample_rate = self.sample_rate / q
         
         # 寻找第一个峰值
-        min_period = int(self.sample_rate / 500)  # 最高500Hz
-        max_period = int(self.sample_rate / 50)   # 最低50Hz
+        min_period = int(sample_rate / 500)  # 最高500Hz
+        max_period = int(sample_rate / 50)   # 最低50Hz
+        
+        # 不足一个最长周期(含比q还短、降采样后为空的块)无法估计基频
+        if len(audio_array) < max_period:
+            return 0.0
+        
+        # 归一化
+        audio_array = audio_array / np.float32(max_abs + 1e-6)
         
-        if len(corr) < max_period:
+        # 自相关(多取一个延迟供峰值插值)
+        corr = self._autocorr(audio_array.astype(np.float32, copy=False), max_period + 1)
+        
+        # 在有效范围内取第一个显著的局部极大(而非全局最大值),避免跳到倍周期;
+        # 两端各多带一个延迟,使范围边界上的峰值也能被识别
+        segment = corr[min_period - 1:max_period + 1]
+        peaks, _ = find_peaks(segment, height=0.3 * corr[0], prominence=0.05 * corr[0])
+        
+        # 没有足够强的周期性(噪声/静音)
+        if peaks.size == 0:
             return 0.0
         
-        # 在有效范围内寻找最大值
-        peak_idx = np.argmax(corr[min_period:max_period]) + min_period
+        peak_idx = int(peaks[0]) + min_period - 1
         
         if peak_idx > 0:
-            pitch = self.sample_rate / peak_idx
+            # 对峰值及相邻两点做抛物线插值,得到亚采样精度的周期
+            period = float(peak_idx)
+            if peak_idx + 1 < len(corr):
+                a, b, c = corr[peak_idx - 1], corr[peak_idx], corr[peak_idx + 1]
+                denom = a - 2 * b + c
+                # 仅在真正的局部极大处插值,偏移量不超过半个采样
+                if denom < 0:
+                    period += 0.5 * (a - c) / denom
+            
+            pitch = sample_rate / period
             return float(pitch)
         
         return 0.0
     
+    def _autocorr(self, x: np.ndarray, max_lag: int) -> np.ndarray:
+        """
+        自相关 (Wiener-Khinchin: 功率谱的逆变换)
+        
+        补零到不小于 2N-1 的快速FFT长度以避免循环混叠,
+        只返回前 max_lag 个延迟。
+        """
+        n = next_fast_len(2 * len(x) - 1, real=True)
+        spectrum = rfft(x, n)
+        return irfft(spectrum * np.conj(spectrum), n)[:min(len(x), max_lag)]
+    
     def get_depression_indicators(self) -> Dict:
         """
         获取抑郁相关语音指标
@@ -201,21 +361,21 @@ class VoiceEmotionAnalyzer:
             return indicators
         
         # 1. 音调分析
-        avg_pitch = np.mean(self.pitch_history)
+        avg_pitch = self.pitch_history.mean()
         # 正常语音基频: 男性85-180Hz, 女性165-255Hz
         # 抑郁时音调降低
         if avg_pitch < 150:  # 偏低
             indicators['low_pitch'] = min(1.0, (150 - avg_pitch) / 50)
         
         # 2. 能量分析
-        avg_energy = np.mean(self.energy_history)
+        avg_energy = self.energy_history.mean()
         # 抑郁时音量减小
         if avg_energy < 1000:  # 偏低
             indicators['low_energy'] = min(1.0, (1000 - avg_energy) / 1000)
         
         # 3. 语速分析 (需要更多数据)
         if len(self.speech_rate_history) > 0:
-            avg_rate = np.mean(self.speech_rate_history)
+            avg_rate = self.speech_rate_history.mean()
             # 正常语速: 150-200词/分钟
             # 抑郁时语速变慢
             if avg_rate < 150:
@@ -223,7 +383,7 @@ class VoiceEmotionAnalyzer:
         
         # 4. 停顿分析
         if len(self.pause_ratio_history) > 0:
-            avg_pause = np.mean(self.pause_ratio_history)
+            avg_pause = self.pause_ratio_history.mean()
             # 抑郁时停顿增多
             if avg_pause > 0.3:
                 indicators['high_pause'] = min(1.0, (avg_pause - 0.3) / 0.3)
@@ -279,22 +439,16 @@ class VoiceEmotionAnalyzer:
         Returns:
             情感分析结果
         """
-        # 抑郁相关关键词
-        depression_keywords = {
-            'negative': ['累', '疲惫', '无聊', '无趣', '没意思', '没劲', '烦', '难受'],
-            'hopeless': ['没希望', '没用', '算了', '放弃', '无所谓', '不想'],
-            'isolation': ['孤独', '一个人', '没人', '不想说', '不想见'],
-            'sleep': ['失眠', '睡不着', '睡不好', '做梦', '早醒'],
-            'appetite': ['不想吃', '没胃口', '吃不下'],
-        }
-        
-        # 统计关键词
-        keyword_counts = {category: 0 for category in depression_keywords}
+        # 统计关键词出现次数
+        keyword_counts = {category: 0 for category in self.depression_keywords}
         
-        for category, keywords in depression_keywords.items():
-            for keyword in keywords:
-                if keyword in text:
-                    keyword_counts[category] += 1
+        if self._keyword_automaton is not None:
+            # 单次扫描文本得到全部命中,按类别计数
+            for _, (category, _) in self._keyword_automaton.iter(text):
+                keyword_counts[category] += 1
+        else:
+            for category, keywords in self.depression_keywords.items():
+                keyword_counts[category] = sum(text.count(keyword) for keyword in keywords)
         
         # 计算抑郁评分
         total_keywords = sum(keyword_counts.values())
@@ -308,6 +462,23 @@ class VoiceEmotionAnalyzer:
             'sentiment': 'depressed' if depression_score > 0.5 else 'neutral'
         }
     
+    def _build_keyword_automaton(self):
+        """
+        将全部关键词编译为一个Aho-Corasick自动机
+        
+        Returns:
+            自动机(值为 (类别, 关键词)),pyahocorasick不可用时返回None
+        """
+        if not AHOCORASICK_AVAILABLE:
+            return None
+        
+        automaton = ahocorasick.Automaton()
+        for category, keywords in self.depression_keywords.items():
+            for keyword in keywords:
+                automaton.add_word(keyword, (category, keyword))
+        automaton.make_automaton()
+        return automaton
+    
     def save_audio_buffer(self, duration: int = 5) -> Optional[str]:
         """
         保存音频缓冲区到文件
@@ -321,17 +492,11 @@ class VoiceEmotionAnalyzer:
         if not self.is_recording:
             return None
         
-        frames = []
         num_chunks = int(self.sample_rate / self.chunk_size * duration)
         
-        for _ in range(num_chunks):
-            try:
-                data = self.audio_queue.get(timeout=1)
-                frames.append(data)
-            except queue.Empty:
-                break
-        
-        if not frames:
+        # 先等到第一个音频块,没有音频时不创建文件
+        data = self._pop_chunk(timeout=1) if num_chunks > 0 else None
+        if data is None:
             return None
         
         # 保存到临时文件
@@ -344,7 +509,16 @@ class VoiceEmotionAnalyzer:
             wf.setnchannels(self.channels)
             wf.setsampwidth(self.audio.get_sample_size(pyaudio.paInt16))
             wf.setframerate(self.sample_rate)
-            wf.writeframes(b''.join(frames))
+            
+            # 音频块边取边写,内存中只保留当前块;
+            # writeframesraw 不逐块回写文件头,close 时统一修正帧数
+            written = 0
+            while data is not None:
+                wf.writeframesraw(data)
+                written += 1
+                if written == num_chunks:
+                    break
+                data = self._pop_chunk(timeout=1)
             wf.close()
             
             return temp_path
@@ -360,17 +534,13 @@ class VoiceEmotionAnalyzer:
         Returns:
             语音特征字典
         """
-        if self.audio_queue.empty():
-            return None
-        
         try:
             # 获取最新的音频块
-            audio_data = self.audio_queue.get_nowait()
-            features = self.analyze_audio_chunk(audio_data)
-            return features
-        
-        except queue.Empty:
+            audio_data = self.audio_queue.popleft()
+        except IndexError:
             return None
+        
+        return self.analyze_audio_chunk(audio_data)
     
     def cleanup(self):
         """清理资源"""
@@ -391,6 +561,8 @@ class VoiceDepressionAssessor:
         
         # 评估历史
         self.assessment_history = deque(maxlen=50)
+        # 评分另存一份连续数组,趋势分析时不必遍历结果字典
+        self._score_history = _HistoryBuffer(50)
         
     def start(self):
         """开始评估"""
@@ -448,6 +620,7 @@ class VoiceDepressionAssessor:
         
         # 记录历史
         self.assessment_history.append(result)
+        self._score_history.append(overall_score)
         
         # 清理临时文件
         try:
@@ -479,12 +652,12 @@ class VoiceDepressionAssessor:
                 'message': '数据不足'
             }
         
-        # 提取评分
-        scores = [a['overall_score'] for a in self.assessment_history]
+        # 提取评分(按时间顺序)
+        scores = self._score_history.values()
         
         # 计算趋势
-        recent_avg = np.mean(scores[-5:])
-        overall_avg = np.mean(scores)
+        recent_avg = float(scores[-5:].mean(dtype=np.float64))
+        overall_avg = float(scores.mean(dtype=np.float64))
         trend = 'increasing' if recent_avg > overall_avg else 'decreasing'
         
         return {
@@ -4,39 +4,68 @@
 整合多模态抑郁症检测算法
 """
 
+import os
 import sys
 import json
+import importlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import cv2
 import numpy as np
 from pathlib import Path
 
-# 添加core模块到路径
-sys.path.insert(0, str(Path(__file__).parent / 'core'))
-
-try:
-    from core.face_detector import FaceDetector
-    from core.landmark_detector import LandmarkDetector
-    from core.au_detector import AUDetector
-    from core.emotion_recognizer import EmotionRecognizer
-    from core.depression_assessor import DepressionRiskAssessor
-except ImportError:
-    # 如果导入失败,使用简化版本
-    pass
+# 高级模型 (属性名, 模块, 类名): 依赖较重,首次分析时才导入,只走基础分析时不加载
+_ADVANCED_MODELS = (
+    ('face_detector', 'core.face_detector', 'FaceDetector'),
+    ('landmark_detector', 'core.landmark_detector', 'LandmarkDetector'),
+    ('au_detector', 'core.au_detector', 'AUDetector'),
+    ('emotion_recognizer', 'core.emotion_recognizer', 'EmotionRecognizer'),
+    ('depression_assessor', 'core.depression_assessor', 'DepressionRiskAssessor'),
+)
 
 
 class EnhancedFaceAnalyzer:
     """增强版面部分析器"""
     
+    # Haar级联分类器(进程内共享,首次使用基础分析时加载)
+    _face_cascade = None
+    _eye_cascade = None
+    
+    # CUDA版级联分类器(检测到CUDA设备时使用,None表示不可用)
+    _cuda_cascades = None
+    _cuda_probed = False
+    
+    # 抑郁症AU评分规则: sign * (激活值 - 阈值) > 0 时计入对应权重
+    # AU4 眉头紧锁 > 3, AU12 微笑缺失 < 1, AU15 嘴角下垂 > 3, AU6 脸颊上提缺失 < 1
+    _DEPRESSION_AU_KEYS = ('AU4', 'AU12', 'AU15', 'AU6')
+    _DEPRESSION_AU_THRESHOLDS = np.array([3.0, 1.0, 3.0, 1.0])
+    _DEPRESSION_AU_SIGNS = np.array([1.0, -1.0, 1.0, -1.0])
+    _DEPRESSION_AU_WEIGHTS = np.array([20, 25, 25, 15])
+    
+    # 模拟AU数据: 各AU在 [0, 上限) 内均匀取值
+    _MOCK_AU_KEYS = ('AU1', 'AU2', 'AU4', 'AU6', 'AU12', 'AU15', 'AU25', 'AU26')
+    _MOCK_AU_SCALE = np.array([3, 3, 5, 4, 4, 5, 3, 3], dtype=np.float32)
+    
     def __init__(self):
-        """初始化所有检测器"""
+        """初始化分析器(高级模型在首次分析时加载)"""
+        # None 表示尚未尝试加载高级模型
+        self.use_advanced = None
+        self._rng = np.random.default_rng()
+    
+    def _try_load_advanced(self):
+        """
+        导入并初始化高级模型,失败时退回基础检测
+        
+        设置环境变量 FACE_BASIC_ONLY=1 可跳过加载,直接使用基础OpenCV分析。
+        """
         self.use_advanced = False
+        if os.environ.get('FACE_BASIC_ONLY') == '1':
+            return
         
         try:
-            self.face_detector = FaceDetector()
-            self.landmark_detector = LandmarkDetector()
-            self.au_detector = AUDetector()
-            self.emotion_recognizer = EmotionRecognizer()
-            self.depression_assessor = DepressionRiskAssessor()
+            for attr, module_name, class_name in _ADVANCED_MODELS:
+                model_class = getattr(importlib.import_module(module_name), class_name)
+                setattr(self, attr, model_class())
             self.use_advanced = True
         except Exception as e:
             print(f"Warning: Advanced models not available, using basic detection: {e}", file=sys.stderr)
@@ -51,15 +80,65 @@ class EnhancedFaceAnalyzer:
         Returns:
             分析结果字典
         """
+        image, error = self._read_image(image_path)
+        if error is not None:
+            return error
+        
+        return self._analyze_loaded(image, image_path)
+    
+    def analyze_images(self, image_paths: list) -> list:
+        """
+        批量分析多张图像(如视频帧序列)
+        
+        图像在线程池中并行解码(cv2.imread 释放GIL),与逐帧分析重叠进行;
+        最多提前解码 workers 帧,内存占用不随序列长度增长。
+        分析仍按输入顺序执行,风险评估器按帧序累积历史。
+        
+        Args:
+            image_paths: 图像文件路径列表
+            
+        Returns:
+            分析结果字典列表,顺序与输入一致
+        """
+        if not image_paths:
+            return []
+        
+        workers = min(len(image_paths), os.cpu_count() or 1, 8)
+        results = []
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = deque(pool.submit(self._read_image, path) for path in image_paths[:workers])
+            for i, path in enumerate(image_paths):
+                future = pending.popleft()
+                # 取走一帧就补提交一帧,保持 workers 帧的预读窗口
+                if i + workers < len(image_paths):
+                    pending.append(pool.submit(self._read_image, image_paths[i + workers]))
+                image, error = future.result()
+                results.append(error if error is not None else self._analyze_loaded(image, path))
+        return results
+    
+    @staticmethod
+    def _read_image(image_path: str):
+        """读取图像,返回 (图像, None);读取抛出异常时返回 (None, 错误结果字典)"""
+        try:
+            return cv2.imread(image_path), None
+        except Exception as e:
+            return None, {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def _analyze_loaded(self, image: np.ndarray, image_path: str) -> dict:
+        """分析已解码的图像"""
         try:
-            # 读取图像
-            image = cv2.imread(image_path)
             if image is None:
                 return {
                     'success': False,
                     'error': f'Failed to load image: {image_path}'
                 }
             
+            if self.use_advanced is None:
+                self._try_load_advanced()
+            
             # 如果高级模型可用,使用完整分析
             if self.use_advanced:
                 return self._analyze_with_models(image)
@@ -103,26 +182,31 @@ class EnhancedFaceAnalyzer:
             )
             risk_assessment = self.depression_assessor.assess()
             
+            # 结果字段只查一次,后续复用
+            au_activations = au_result.get('au_activations', {})
+            emotion = emotion_result.get('emotion', 'neutral')
+            confidence = emotion_result.get('confidence', 0)
+            
             # 6. 计算抑郁症特征评分
-            depression_score = self._calculate_depression_score(au_result, emotion_result)
+            depression_score = self._calculate_depression_score(au_activations, emotion, confidence)
             
             return {
                 'success': True,
-                'emotion': emotion_result.get('emotion', 'neutral'),
-                'confidence': int(emotion_result.get('confidence', 0) * 100),
+                'emotion': emotion,
+                'confidence': int(confidence * 100),
                 'riskLevel': risk_assessment.get('risk_level', 'low'),
                 'riskScore': int(risk_assessment.get('risk_score', 0)),
-                'auFeatures': au_result.get('au_activations', {}),
+                'auFeatures': au_activations,
                 'facialFeatures': {
-                    'eyebrowMovement': self._calculate_eyebrow_movement(au_result),
-                    'mouthCorner': self._calculate_mouth_corner(au_result),
+                    'eyebrowMovement': self._calculate_eyebrow_movement(au_activations),
+                    'mouthCorner': self._calculate_mouth_corner(au_activations),
                     'eyeGaze': 50  # 需要眼动追踪数据
                 },
                 'depressionIndicators': {
-                    'lackOfSmile': au_result.get('au_activations', {}).get('AU12', 0) < 1.0,
-                    'frownPresent': au_result.get('au_activations', {}).get('AU4', 0) > 3.0,
-                    'mouthCornerDown': au_result.get('au_activations', {}).get('AU15', 0) > 3.0,
-                    'emotionalFlattening': emotion_result.get('emotion') == 'neutral' and emotion_result.get('confidence', 0) > 0.8
+                    'lackOfSmile': au_activations.get('AU12', 0) < 1.0,
+                    'frownPresent': au_activations.get('AU4', 0) > 3.0,
+                    'mouthCornerDown': au_activations.get('AU15', 0) > 3.0,
+                    'emotionalFlattening': emotion == 'neutral' and confidence > 0.8
                 },
                 'depressionScore': depression_score
             }
@@ -134,12 +218,9 @@ class EnhancedFaceAnalyzer:
     def _analyze_basic(self, image: np.ndarray) -> dict:
         """使用OpenCV基础分析"""
         try:
-            # 使用Haar级联检测人脸
-            face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-            eye_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_eye.xml')
-            
+            # 使用Haar级联检测人脸和眼睛
             gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            faces = face_cascade.detectMultiScale(gray, 1.3, 5)
+            faces, eyes = self._detect_face_and_eyes(gray)
             
             if len(faces) == 0:
                 return {
@@ -151,9 +232,6 @@ class EnhancedFaceAnalyzer:
             (x, y, w, h) = faces[0]
             face_roi = gray[y:y+h, x:x+w]
             
-            # 检测眼睛
-            eyes = eye_cascade.detectMultiScale(face_roi)
-            
             # 基于简单规则的情绪估计
             emotion, confidence = self._estimate_emotion_basic(face_roi, eyes)
             
@@ -181,6 +259,64 @@ class EnhancedFaceAnalyzer:
                 'error': f'Basic analysis failed: {str(e)}'
             }
     
+    @classmethod
+    def _get_cascades(cls) -> tuple:
+        """获取人脸/眼睛Haar级联分类器,XML只在首次调用时解析"""
+        if cls._face_cascade is None:
+            cls._face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+            cls._eye_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_eye.xml')
+        return cls._face_cascade, cls._eye_cascade
+    
+    @classmethod
+    def _get_cuda_cascades(cls):
+        """获取CUDA版人脸/眼睛级联分类器,无CUDA设备或加载失败时返回None"""
+        if not cls._cuda_probed:
+            cls._cuda_probed = True
+            try:
+                if cv2.cuda.getCudaEnabledDeviceCount() > 0:
+                    face_cascade = cv2.cuda_CascadeClassifier.create(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+                    face_cascade.setScaleFactor(1.3)
+                    face_cascade.setMinNeighbors(5)
+                    # 与CPU版 detectMultiScale 的默认参数保持一致
+                    eye_cascade = cv2.cuda_CascadeClassifier.create(cv2.data.haarcascades + 'haarcascade_eye.xml')
+                    eye_cascade.setScaleFactor(1.1)
+                    eye_cascade.setMinNeighbors(3)
+                    cls._cuda_cascades = (face_cascade, eye_cascade)
+            except (AttributeError, cv2.error) as e:
+                print(f"Warning: CUDA cascade not available, using CPU detection: {e}", file=sys.stderr)
+        return cls._cuda_cascades
+    
+    def _detect_face_and_eyes(self, gray: np.ndarray) -> tuple:
+        """
+        检测人脸,并在第一个人脸区域内检测眼睛
+        
+        有CUDA设备时灰度图只上传一次,两级检测都在GPU上完成;否则使用CPU级联。
+        
+        Returns:
+            (人脸矩形列表, 眼睛矩形列表)
+        """
+        cuda_cascades = self._get_cuda_cascades()
+        if cuda_cascades is not None:
+            face_cascade, eye_cascade = cuda_cascades
+            gpu_gray = cv2.cuda_GpuMat()
+            gpu_gray.upload(gray)
+            faces = face_cascade.convert(face_cascade.detectMultiScale(gpu_gray))
+            if faces is None or len(faces) == 0:
+                return [], []
+            
+            gpu_roi = cv2.cuda_GpuMat(gpu_gray, tuple(int(v) for v in faces[0]))
+            eyes = eye_cascade.convert(eye_cascade.detectMultiScale(gpu_roi))
+            return faces, eyes if eyes is not None else []
+        
+        face_cascade, eye_cascade = self._get_cascades()
+        faces = face_cascade.detectMultiScale(gray, 1.3, 5)
+        if len(faces) == 0:
+            return faces, []
+        
+        (x, y, w, h) = faces[0]
+        eyes = eye_cascade.detectMultiScale(gray[y:y+h, x:x+w])
+        return faces, eyes
+    
     def _estimate_emotion_basic(self, face_roi: np.ndarray, eyes: list) -> tuple:
         """基础情绪估计"""
         # 计算图像亮度和对比度
@@ -211,59 +347,40 @@ class EnhancedFaceAnalyzer:
     
     def _generate_mock_au(self) -> dict:
         """生成模拟AU数据"""
-        return {
-            'AU1': np.random.uniform(0, 3),
-            'AU2': np.random.uniform(0, 3),
-            'AU4': np.random.uniform(0, 5),
-            'AU6': np.random.uniform(0, 4),
-            'AU12': np.random.uniform(0, 4),
-            'AU15': np.random.uniform(0, 5),
-            'AU25': np.random.uniform(0, 3),
-            'AU26': np.random.uniform(0, 3)
-        }
+        values = self._rng.random(len(self._MOCK_AU_KEYS), dtype=np.float32) * self._MOCK_AU_SCALE
+        return dict(zip(self._MOCK_AU_KEYS, values.tolist()))
     
-    def _calculate_depression_score(self, au_result: dict, emotion_result: dict) -> int:
+    def _calculate_depression_score(self, au_activations: dict, emotion: str, confidence: float) -> int:
         """
         计算抑郁症评分 (0-100)
         基于临床研究的AU模式
-        """
-        score = 0
-        au_activations = au_result.get('au_activations', {})
-        
-        # AU4 (眉头紧锁) - 抑郁症的重要指标
-        if au_activations.get('AU4', 0) > 3:
-            score += 20
-        
-        # AU12 (微笑缺失) - 快感缺失的标志
-        if au_activations.get('AU12', 0) < 1:
-            score += 25
-        
-        # AU15 (嘴角下垂) - 悲伤表情
-        if au_activations.get('AU15', 0) > 3:
-            score += 25
         
-        # AU6 (脸颊上提缺失) - 缺乏真实微笑
-        if au_activations.get('AU6', 0) < 1:
-            score += 15
+        Args:
+            au_activations: AU激活值字典
+            emotion: 识别出的情绪
+            confidence: 情绪置信度 (0-1)
+        """
+        # AU规则一次向量化判断: 眉头紧锁、微笑缺失、嘴角下垂、脸颊上提缺失
+        aus = np.array([au_activations.get(key, 0) for key in self._DEPRESSION_AU_KEYS], dtype=np.float64)
+        triggered = self._DEPRESSION_AU_SIGNS * (aus - self._DEPRESSION_AU_THRESHOLDS) > 0
+        score = int(np.dot(triggered, self._DEPRESSION_AU_WEIGHTS))
         
         # 情绪扁平化
-        if emotion_result.get('emotion') == 'neutral' and emotion_result.get('confidence', 0) > 0.8:
+        if emotion == 'neutral' and confidence > 0.8:
             score += 15
         
         return min(100, score)
     
-    def _calculate_eyebrow_movement(self, au_result: dict) -> float:
+    def _calculate_eyebrow_movement(self, au_activations: dict) -> float:
         """计算眉毛活动度"""
-        au_activations = au_result.get('au_activations', {})
         au1 = au_activations.get('AU1', 0)
         au2 = au_activations.get('AU2', 0)
         au4 = au_activations.get('AU4', 0)
         
         return min(100, (au1 + au2 + au4) * 10)
     
-    def _calculate_mouth_corner(self, au_result: dict) -> float:
+    def _calculate_mouth_corner(self, au_activations: dict) -> float:
         """计算嘴角活动度"""
-        au_activations = au_result.get('au_activations', {})
         au12 = au_activations.get('AU12', 0)
         au15 = au_activations.get('AU15', 0)
         
@@ -271,17 +388,8 @@ class EnhancedFaceAnalyzer:
         return 50 + (au12 * 10) - (au15 * 10)
 
 
-def main():
-    """主函数"""
-    if len(sys.argv) < 2:
-        print(json.dumps({
-            'success': False,
-            'error': 'Usage: python face_analyzer.py <image_path>'
-        }))
-        sys.exit(1)
-    
-    image_path = sys.argv[1]
-    
+def _run_oneshot(image_path: str):
+    """单次模式: 分析一张图像并输出JSON结果"""
     # 检查文件是否存在
     if not Path(image_path).exists():
         print(json.dumps({
@@ -298,5 +406,65 @@ def main():
     print(json.dumps(result, indent=2))
 
 
+def _run_worker():
+    """
+    常驻模式: 从stdin逐行读取图像路径,每张图像输出一行JSON结果
+    
+    模型和级联分类器只在进程启动时加载一次,由调用方长期持有进程。
+    """
+    out = sys.stdout
+    # stdout只用于逐行输出结果,分析过程中的其他打印转到stderr
+    sys.stdout = sys.stderr
+    
+    analyzer = EnhancedFaceAnalyzer()
+    
+    for line in sys.stdin:
+        image_path = line.strip()
+        if not image_path:
+            continue
+        
+        if not Path(image_path).exists():
+            result = {
+                'success': False,
+                'error': f'Image file not found: {image_path}'
+            }
+        else:
+            result = analyzer.analyze_image(image_path)
+        
+        try:
+            output = json.dumps(result)
+        except (TypeError, ValueError) as e:
+            output = json.dumps({'success': False, 'error': f'Failed to encode result: {e}'})
+        
+        out.write(output + '\n')
+        out.flush()
+
+
+def main():
+    """
+    主函数
+    
+    用法:
+        python face_analyzer.py [--oneshot] <image_path>   分析单张图像后退出
+        python face_analyzer.py                            常驻模式,从stdin逐行读取图像路径
+    """
+    args = sys.argv[1:]
+    oneshot = bool(args) and args[0] == '--oneshot'
+    if oneshot:
+        args = args[1:]
+    
+    if not args:
+        if oneshot:
+            print(json.dumps({
+                'success': False,
+                'error': 'Usage: python face_analyzer.py [--oneshot] <image_path>'
+            }))
+            sys.exit(1)
+        _run_worker()
+        return
+    
+    _run_oneshot(args[0])
+
+
 if __name__ == '__main__':
     main()
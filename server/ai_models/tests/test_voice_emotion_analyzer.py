@@ -0,0 +1,25 @@
+"""
+语音情感分析模块测试
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+pytest.importorskip('pyaudio')
+
+from core.voice_emotion_analyzer import VoiceEmotionAnalyzer
+
+
+def test_chunk_shorter_than_decimation_factor():
+    """比降采样因子q还短的音频块不应报错,音调返回0"""
+    analyzer = VoiceEmotionAnalyzer(sample_rate=16000)
+    assert analyzer._pitch_decimation == 2
+    
+    result = analyzer.analyze_audio_chunk(np.array([1234], dtype=np.int16).tobytes())
+    
+    assert result['pitch'] == 0.0
@@ -3,7 +3,8 @@
  * 将Python模型封装为Node.js可调用的API
  */
 
-import { spawn } from 'child_process';
+import { spawn, type ChildProcessWithoutNullStreams } from 'child_process';
+import type { Socket } from 'net';
 import path from 'path';
 import fs from 'fs/promises';
 
@@ -36,15 +37,13 @@ export async function analyzeFaceImage(imageBuffer: Buffer): Promise<FaceDetecti
     const tempImagePath = path.join(tempDir, `face_${Date.now()}.jpg`);
     await fs.writeFile(tempImagePath, imageBuffer);
 
-    // 调用Python脚本进行识别
-    const pythonScript = path.join(process.cwd(), 'server/ai_models/face_analyzer.py');
-    
-    const result = await runPythonScript(pythonScript, [tempImagePath]);
-
-    // 清理临时文件
-    await fs.unlink(tempImagePath).catch(() => {});
-
-    return result;
+    // 交给常驻Python进程识别
+    try {
+      return await faceAnalyzerWorker.analyze(tempImagePath);
+    } finally {
+      // 清理临时文件
+      await fs.unlink(tempImagePath).catch(() => {});
+    }
   } catch (error) {
     console.error('Face detection error:', error);
     return {
@@ -54,42 +53,138 @@ export async function analyzeFaceImage(imageBuffer: Buffer): Promise<FaceDetecti
   }
 }
 
+interface PendingRequest {
+  resolve: (result: FaceDetectionResult) => void;
+  reject: (error: Error) => void;
+}
+
+// 单张图像的分析时限(首个请求包含模型加载时间);超时后结束并重启Python进程
+const WORKER_REQUEST_TIMEOUT_MS = 30_000;
+
 /**
- * 运行Python脚本
+ * 常驻Python分析进程
+ * 进程只启动一次(模型只加载一次),图像路径逐行写入stdin,
+ * 结果按行从stdout读回,与请求按顺序一一对应;进程退出后下次请求时重新启动
  */
-function runPythonScript(scriptPath: string, args: string[]): Promise<FaceDetectionResult> {
-  return new Promise((resolve, reject) => {
+class FaceAnalyzerWorker {
+  private child: ChildProcessWithoutNullStreams | null = null;
+  private pending: PendingRequest[] = [];
+  private stdoutBuffer = '';
+  private stderrTail = '';
+  private timer: NodeJS.Timeout | null = null;
+
+  analyze(imagePath: string): Promise<FaceDetectionResult> {
+    return new Promise((resolve, reject) => {
+      const child = this.ensureProcess();
+      this.pending.push({ resolve, reject });
+      if (this.pending.length === 1) {
+        this.armTimer();
+      }
+      child.stdin.write(`${imagePath}\n`);
+    });
+  }
+
+  /**
+   * 为队首请求计时: 超时说明进程卡住,结束进程并让所有等待中的请求失败,
+   * 下一次请求会重新启动进程
+   */
+  private armTimer() {
+    this.clearTimer();
+
+    const child = this.child;
+    if (!child || this.pending.length === 0) {
+      return;
+    }
+
+    this.timer = setTimeout(() => {
+      this.handleExit(child, new Error(`Python worker timed out after ${WORKER_REQUEST_TIMEOUT_MS} ms`));
+      child.kill('SIGKILL');
+    }, WORKER_REQUEST_TIMEOUT_MS);
+  }
+
+  private clearTimer() {
+    if (this.timer) {
+      clearTimeout(this.timer);
+      this.timer = null;
+    }
+  }
+
+  private ensureProcess(): ChildProcessWithoutNullStreams {
+    if (this.child) {
+      return this.child;
+    }
+
     // 使用虚拟环境的Python
     const pythonPath = path.join(process.cwd(), 'venv/bin/python');
-    const python = spawn(pythonPath, [scriptPath, ...args]);
-    
-    let stdout = '';
-    let stderr = '';
+    const scriptPath = path.join(process.cwd(), 'server/ai_models/face_analyzer.py');
+    const child = spawn(pythonPath, [scriptPath]);
+
+    child.stdout.on('data', (data) => this.handleStdout(data.toString()));
 
-    python.stdout.on('data', (data) => {
-      stdout += data.toString();
+    child.stderr.on('data', (data) => {
+      // 只保留最近的错误输出,用于进程异常退出时的报错信息
+      this.stderrTail = (this.stderrTail + data.toString()).slice(-4096);
     });
 
-    python.stderr.on('data', (data) => {
-      stderr += data.toString();
+    // 写入已退出的进程时由 close/error 统一处理
+    child.stdin.on('error', () => {});
+
+    child.on('error', (error) => this.handleExit(child, error));
+
+    child.on('close', (code) => {
+      this.handleExit(child, new Error(`Python script failed (exit code ${code}): ${this.stderrTail}`));
     });
 
-    python.on('close', (code) => {
-      if (code !== 0) {
-        reject(new Error(`Python script failed: ${stderr}`));
-        return;
+    // 常驻进程不阻止Node退出; Node退出时stdin关闭,Python端读到EOF后自行结束
+    child.unref();
+    for (const stream of [child.stdin, child.stdout, child.stderr]) {
+      (stream as unknown as Socket).unref();
+    }
+
+    this.child = child;
+    return child;
+  }
+
+  private handleStdout(chunk: string) {
+    this.stdoutBuffer += chunk;
+
+    let newline: number;
+    while ((newline = this.stdoutBuffer.indexOf('\n')) >= 0) {
+      const line = this.stdoutBuffer.slice(0, newline);
+      this.stdoutBuffer = this.stdoutBuffer.slice(newline + 1);
+
+      const request = this.pending.shift();
+      if (!request) {
+        continue;
       }
+      this.armTimer();
 
       try {
-        const result = JSON.parse(stdout);
-        resolve(result);
+        request.resolve(JSON.parse(line));
       } catch (error) {
-        reject(new Error(`Failed to parse Python output: ${stdout}`));
+        request.reject(new Error(`Failed to parse Python output: ${line}`));
       }
-    });
-  });
+    }
+  }
+
+  private handleExit(child: ChildProcessWithoutNullStreams, error: Error) {
+    if (this.child !== child) {
+      return;
+    }
+
+    this.clearTimer();
+    this.child = null;
+    this.stdoutBuffer = '';
+    this.stderrTail = '';
+
+    for (const request of this.pending.splice(0)) {
+      request.reject(error);
+    }
+  }
 }
 
+const faceAnalyzerWorker = new FaceAnalyzerWorker();
+
 /**
  * 模拟面部识别(用于开发测试)
  * 实际部署时应使用真实的Python模型